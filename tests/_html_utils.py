@@ -0,0 +1,48 @@
+"""HTML helpers shared by the test suite."""
+import base64
+import re
+from pathlib import Path
+from typing import FrozenSet, Iterable, Union
+
+_SVG_DATA_URI_RE = re.compile(r'data:image/svg\+xml;charset=utf-8;base64,([A-Za-z0-9+/=]+)')
+
+
+def _parse(master_html: str) -> "lxml.html.HtmlElement":  # noqa: F821
+    """Parse consolidated HTML into an lxml tree for XPath assertions.
+
+    Args:
+        master_html: HTML produced by the preprocessor
+
+    Returns:
+        Root element of the parsed document
+    """
+    # Imported here so modules that only need _names do not require lxml
+    import lxml.html
+
+    return lxml.html.fromstring(master_html)
+
+
+def _names(files: Iterable[Union[str, Path]]) -> FrozenSet[str]:
+    """Collect the file names of a list of HTML file paths.
+
+    Args:
+        files: Paths as returned by the downloader or preprocessor
+
+    Returns:
+        Frozen set of the base names, for constant-time membership checks
+    """
+    return frozenset(Path(f).name for f in files)
+
+
+def _svg_markup(html: str) -> str:
+    """Decode the inline SVG data URIs in generated HTML back to markup.
+
+    Args:
+        html: HTML produced by the preprocessor, or a single data URI
+
+    Returns:
+        The decoded SVG documents, one per line
+    """
+    return '\n'.join(
+        base64.b64decode(payload).decode('utf-8') for payload in _SVG_DATA_URI_RE.findall(html)
+    )
@@ -1,9 +1,114 @@
 """Test configuration and fixtures."""
+import argparse
 import os
+import subprocess
+import types
 from pathlib import Path
+from typing import Dict
 
 import pytest
 
+from web2llm.__main__ import _build_parser
+from web2llm.converter import _wkhtmltopdf_config
+from web2llm.preprocessor import HTMLPreprocessor
+
+
+# Subpage markup for mock_website_dir, formatted with the page number
+_SUBPAGE_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head><title>Page {i}</title></head>
+<body>
+    <h1>Page {i}</h1>
+    <p>Content for page {i}</p>
+</body>
+</html>
+"""
+
+
+@pytest.fixture(autouse=True)
+def _stub_pdfkit(monkeypatch: pytest.MonkeyPatch, request: pytest.FixtureRequest) -> None:
+    """Replace wkhtmltopdf with an empty PDF write unless the test is an integration test."""
+    # Drop any configuration cached by an earlier test, stubbed or real
+    _wkhtmltopdf_config.cache_clear()
+    if request.node.get_closest_marker("integration"):
+        return
+
+    def from_string(input, output_path, options=None, **kwargs):
+        Path(output_path).write_bytes(b"")
+        return True
+
+    monkeypatch.setattr("pdfkit.from_string", from_string)
+    monkeypatch.setattr("pdfkit.configuration", lambda **kwargs: None)
+
+
+@pytest.fixture
+def cwd(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Run the test from inside its tmp_path and return that directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def httrack(monkeypatch: pytest.MonkeyPatch):
+    """Replace the HTTrack process with a scripted stand-in.
+
+    Returns a configure function taking the return code and output chunks. It
+    returns the list that collects the positional arguments of each Popen call.
+    """
+    def _configure(rc: int = 0, lines=("",)) -> list:
+        captured_args = []
+        encoded = [line if isinstance(line, bytes) else line.encode() for line in lines]
+        chunks = iter(encoded + [b""])
+        proc = types.SimpleNamespace(
+            stdout=types.SimpleNamespace(read1=lambda size=-1: next(chunks)),
+            poll=lambda: rc,
+            wait=lambda: rc,
+            returncode=rc,
+        )
+        monkeypatch.setattr(subprocess, 'Popen', lambda *a, **k: (captured_args.append(a), proc)[1])
+        return captured_args
+
+    return _configure
+
+
+class MemoryHTMLPreprocessor(HTMLPreprocessor):
+    """Preprocessor that serves a fixed set of HTML files from memory."""
+
+    def __init__(self, base_dir: str, files: Dict[str, str], **kwargs):
+        super().__init__(base_dir, **kwargs)
+        self._files = {
+            os.path.join(base_dir, name): content.encode('utf-8')
+            for name, content in files.items()
+        }
+
+    def _fs_read(self, file_path: str) -> bytes:
+        try:
+            return self._files[file_path]
+        except KeyError:
+            raise FileNotFoundError(file_path) from None
+
+    def _scan_html_files(self, directory: str):
+        return (path for path in self._files if path.endswith('.html'))
+
+
+@pytest.fixture
+def memory_preprocessor(tmp_path: Path):
+    """Return a factory for preprocessors reading the given {relative path: html} files.
+
+    Files are never written; tmp_path only anchors the absolute resource paths.
+    """
+    def _create(files: Dict[str, str], **kwargs) -> MemoryHTMLPreprocessor:
+        return MemoryHTMLPreprocessor(str(tmp_path), files, **kwargs)
+
+    return _create
+
+
+@pytest.fixture(scope="session")
+def arg_parser() -> argparse.ArgumentParser:
+    """Return the CLI argument parser, built once per test session."""
+    return _build_parser()
+
 
 @pytest.fixture
 def test_data_dir() -> Path:
@@ -11,7 +116,7 @@ def test_data_dir() -> Path:
     return Path(__file__).parent / "data"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_html() -> str:
     """Return sample HTML content."""
     return """
@@ -34,30 +139,47 @@ def sample_html() -> str:
     """
 
 
-@pytest.fixture
-def mock_website_dir(tmp_path: Path, sample_html: str) -> Path:
-    """Create a mock website directory structure."""
-    site_dir = tmp_path / "test_site"
-    site_dir.mkdir()
+@pytest.fixture(scope="session")
+def large_html() -> str:
+    """Return an HTML document with 1000 paragraphs."""
+    body = "".join(f"<p>Paragraph {i}</p>" for i in range(1000))
+    return f"<html><body>{body}</body></html>"
+
+
+@pytest.fixture(scope="session")
+def unicode_html() -> str:
+    """Return HTML content with CJK characters and emoji."""
+    return """
+    <html>
+    <body>
+        <h1>Unicode Test</h1>
+        <p>Chinese: 你好世界</p>
+        <p>Japanese: こんにちは世界</p>
+        <p>Korean: 안녕하세요 세계</p>
+        <p>Emoji: 👋 🌍 ✨</p>
+    </body>
+    </html>
+    """
+
+
+@pytest.fixture(scope="session")
+def mock_website_dir(tmp_path_factory: pytest.TempPathFactory, sample_html: str) -> Path:
+    """Create a mock website directory structure, shared across the test session.
+
+    Tests must treat this directory as read-only.
+    """
+    site_dir = tmp_path_factory.mktemp("test_site", numbered=False)
 
     # Create main page
-    with open(site_dir / "index.html", "w") as f:
-        f.write(sample_html)
+    (site_dir / "index.html").write_text(sample_html)
 
     # Create subpages
-    for i in range(1, 3):
-        page_dir = site_dir / f"page{i}"
+    subpages = [
+        (site_dir / f"page{i}", _SUBPAGE_TEMPLATE.format(i=i))
+        for i in range(1, 3)
+    ]
+    for page_dir, content in subpages:
         page_dir.mkdir(exist_ok=True)
-        with open(page_dir / "index.html", "w") as f:
-            f.write(f"""
-            <!DOCTYPE html>
-            <html>
-            <head><title>Page {i}</title></head>
-            <body>
-                <h1>Page {i}</h1>
-                <p>Content for page {i}</p>
-            </body>
-            </html>
-            """)
+        (page_dir / "index.html").write_text(content)
 
     return site_dir
\ No newline at end of file
@@ -1,181 +1,161 @@
 """Tests for CLI functionality."""
-import shutil
+import argparse
+import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
-from web2llm.__main__ import main, parse_args
+from web2llm.__main__ import get_website_name, main, parse_args
+from web2llm.downloader import WebsiteDownloader
 
 
-@pytest.fixture
-def mock_website_dir(tmp_path: Path) -> Path:
-    """Create a mock website directory with test files."""
-    website_dir = tmp_path / "website"
-    website_dir.mkdir()
-    (website_dir / "index.html").write_text("<html><body>Test</body></html>")
-    return website_dir
-
-
-def test_cli_basic_conversion(mock_website_dir: Path, tmp_path: Path):
-    """Test basic website to PDF conversion via CLI."""
-    output_file = tmp_path / "output.pdf"
-
-    with patch('sys.argv', ['web2llm', 'https://example.com', '--output', str(output_file)]):
-        args = parse_args()
-        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-        assert output_file.exists()
-
-
-def test_cli_with_debug_output(mock_website_dir: Path, tmp_path: Path):
-    """Test CLI with debug output enabled."""
+@pytest.fixture(autouse=True)
+def _stub_download(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Replace the HTTrack download with an empty web directory."""
+    def download(self, url: str, output_dir: Path) -> Path:
+        web_dir = output_dir / "web"
+        web_dir.mkdir(parents=True, exist_ok=True)
+        return web_dir
+
+    monkeypatch.setattr(WebsiteDownloader, "download", download)
+
+
+@pytest.mark.parametrize("extra_args,expect_debug", [
+    ([], False),
+    (['--debug'], True),
+    (['--quiet'], False),
+], ids=["basic", "debug", "quiet"])
+def test_cli_conversion(
+    mock_website_dir: Path,
+    tmp_path: Path,
+    cwd: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    arg_parser: argparse.ArgumentParser,
+    extra_args: list,
+    expect_debug: bool,
+):
+    """Test website to PDF conversion via CLI with different flags."""
     output_file = tmp_path / "output.pdf"
 
-    with patch('sys.argv', [
-        'web2llm',
-        'https://example.com',
-        '--output', str(output_file),
-        '--debug'
-    ]):
-        args = parse_args()
-        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-        debug_dir = Path.cwd() / "output" / "debug"
+    monkeypatch.setattr(sys, 'argv', ['web2llm', 'https://example.com', '--output', str(output_file)] + extra_args)
+    args = arg_parser.parse_args(sys.argv[1:])
+    main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
+    assert output_file.exists()
+    if expect_debug:
+        debug_dir = cwd / "output" / "debug"
         assert debug_dir.exists()
         assert (debug_dir / "master.html").exists()
 
 
-def test_cli_with_custom_options(mock_website_dir: Path, tmp_path: Path):
-    """Test CLI with custom PDF options."""
-    output_file = tmp_path / "output.pdf"
+def test_cli_with_invalid_input(cwd: Path, arg_parser: argparse.ArgumentParser, monkeypatch: pytest.MonkeyPatch):
+    """Test CLI with invalid URL."""
+    def download(self, url: str, output_dir: Path) -> Path:
+        raise RuntimeError("HTTrack failed with return code 1")
 
-    with patch('sys.argv', [
-        'web2llm',
-        'https://example.com',
-        '--output', str(output_file),
-        '--debug'
-    ]):
-        args = parse_args()
+    monkeypatch.setattr(WebsiteDownloader, "download", download)
+    monkeypatch.setattr(sys, 'argv', ['web2llm', 'not_a_url', '--output', 'output.pdf'])
+    args = arg_parser.parse_args(sys.argv[1:])
+    with pytest.raises(SystemExit):
         main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-        assert output_file.exists()
-
-
-def test_cli_with_invalid_input():
-    """Test CLI with invalid URL."""
-    with patch('sys.argv', ['web2llm', 'not_a_url', '--output', 'output.pdf']):
-        args = parse_args()
-        with pytest.raises(SystemExit):
-            main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
 
 
-def test_cli_with_invalid_output():
+def test_cli_with_invalid_output(
+    tmp_path: Path, cwd: Path, monkeypatch: pytest.MonkeyPatch, arg_parser: argparse.ArgumentParser
+):
     """Test CLI with invalid output path."""
-    with patch('sys.argv', ['web2llm', 'https://example.com', '--output', '/invalid/path/output.pdf']):
-        args = parse_args()
-        with pytest.raises(SystemExit):
-            main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-
-
-def test_cli_help():
-    """Test CLI help output."""
-    with patch('sys.argv', ['web2llm', '--help']):
-        with pytest.raises(SystemExit) as exc_info:
-            parse_args()
-        assert exc_info.value.code == 0
-
-
-def test_cli_quiet_mode(mock_website_dir: Path, tmp_path: Path):
-    """Test CLI in quiet mode."""
-    output_file = tmp_path / "output.pdf"
-
-    with patch('sys.argv', [
-        'web2llm',
-        'https://example.com',
-        '--output', str(output_file),
-        '--quiet'
-    ]):
-        args = parse_args()
+    # A regular file as parent directory is invalid even when running as root
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    invalid_output = blocker / "output.pdf"
+
+    monkeypatch.setattr(sys, 'argv', ['web2llm', 'https://example.com', '--output', str(invalid_output)])
+    args = arg_parser.parse_args(sys.argv[1:])
+    with pytest.raises(SystemExit):
         main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-        assert output_file.exists()
-
 
-def test_cli_with_httrack_options(mock_website_dir: Path, tmp_path: Path):
-    """Test CLI with custom HTTrack options."""
-    output_file = tmp_path / "output.pdf"
 
-    with patch('sys.argv', [
-        'web2llm',
-        'https://example.com',
-        '--output', str(output_file),
-        '--debug'
-    ]):
-        args = parse_args()
-        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-        assert output_file.exists()
+def test_cli_help(monkeypatch: pytest.MonkeyPatch):
+    """Test CLI help output."""
+    monkeypatch.setattr(sys, 'argv', ['web2llm', '--help'])
+    with pytest.raises(SystemExit) as exc_info:
+        parse_args()
+    assert exc_info.value.code == 0
 
 
-def test_cli_skip_download(mock_website_dir: Path, tmp_path: Path):
+def test_cli_skip_download(
+    mock_website_dir: Path,
+    tmp_path: Path,
+    cwd: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    arg_parser: argparse.ArgumentParser,
+):
     """Test CLI with skip download option."""
     output_file = tmp_path / "output.pdf"
-    downloads_dir = Path.cwd() / "downloads" / "example.com"
-
-    # Remove the downloads directory if it exists
-    if downloads_dir.exists():
-        import shutil
-        shutil.rmtree(downloads_dir)
+    # cwd is a fresh tmp_path, so no downloads directory exists yet
+    assert not (cwd / "downloads" / "example.com").exists()
 
-    with patch('sys.argv', [
+    monkeypatch.setattr(sys, 'argv', [
         'web2llm',
         'https://example.com',
         '--output', str(output_file),
         '--skip-download'
-    ]):
-        args = parse_args()
-        with pytest.raises(SystemExit):
-            main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
+    ])
+    args = arg_parser.parse_args(sys.argv[1:])
+    with pytest.raises(SystemExit):
+        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
 
 
-def test_cli_download_only(mock_website_dir: Path, tmp_path: Path):
+def test_cli_download_only(
+    mock_website_dir: Path,
+    tmp_path: Path,
+    cwd: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    arg_parser: argparse.ArgumentParser,
+):
     """Test CLI with download only option."""
     output_file = tmp_path / "output.pdf"
 
-    with patch('sys.argv', [
+    monkeypatch.setattr(sys, 'argv', [
         'web2llm',
         'https://example.com',
         '--output', str(output_file),
         '--download-only'
-    ]):
-        args = parse_args()
-        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
-        assert not output_file.exists()  # PDF should not be created in download-only mode
+    ])
+    args = arg_parser.parse_args(sys.argv[1:])
+    main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
+    assert not output_file.exists()  # PDF should not be created in download-only mode
 
 
-def test_cli_skip_download_with_missing_web_dir(tmp_path: Path):
+def test_cli_skip_download_with_missing_web_dir(
+    cwd: Path, monkeypatch: pytest.MonkeyPatch, arg_parser: argparse.ArgumentParser
+):
     """Test skip_download option when web directory doesn't exist."""
-    with patch('sys.argv', [
+    monkeypatch.setattr(sys, 'argv', [
         'web2llm',
         'https://example.com',
         '--output', 'output.pdf',
         '--skip-download'
-    ]), patch('pathlib.Path.cwd', return_value=tmp_path):
-        args = parse_args()
-        with pytest.raises(SystemExit):
-            main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
+    ])
+    args = arg_parser.parse_args(sys.argv[1:])
+    with pytest.raises(SystemExit):
+        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
 
 
-def test_cli_main_execution():
+def test_cli_main_execution(monkeypatch: pytest.MonkeyPatch, arg_parser: argparse.ArgumentParser):
     """Test the __main__ block execution."""
-    with patch('sys.argv', [
+    monkeypatch.setattr(sys, 'argv', [
         'web2llm',
         'https://example.com',
         '--output', 'output.pdf'
-    ]):
-        args = parse_args()
-        assert args.url == 'https://example.com'
-        assert args.output == 'output.pdf'
-        assert not args.debug
-        assert not args.quiet
-        assert not args.skip_download
-        assert not args.download_only
+    ])
+    args = arg_parser.parse_args(sys.argv[1:])
+    assert args.url == 'https://example.com'
+    assert args.output == 'output.pdf'
+    assert not args.debug
+    assert not args.quiet
+    assert not args.skip_download
+    assert not args.download_only
 
 
 def test_cli_main_module_execution(monkeypatch, capsys):
@@ -211,14 +191,19 @@ def test_cli_skip_download_with_nonexistent_web_dir(tmp_path, monkeypatch):
     assert exc_info.value.code == 1  # Check that the exit code is 1
 
 
-def test_cli_download_only_with_quiet_mode(tmp_path: Path, capfd):
+def test_cli_download_only_with_quiet_mode(
+    tmp_path: Path,
+    cwd: Path,
+    capfd,
+    monkeypatch: pytest.MonkeyPatch,
+    arg_parser: argparse.ArgumentParser,
+):
     """Test CLI with download_only and quiet mode."""
     url = "https://example.com"
     output = tmp_path / "output.pdf"
 
     # Set up the directory structure
-    base_dir = Path.cwd()
-    downloads_dir = base_dir / "downloads" / "example.com"
+    downloads_dir = cwd / "downloads" / "example.com"
     downloads_dir.mkdir(parents=True, exist_ok=True)
 
     # Mock the WebsiteDownloader to avoid actual downloads
@@ -231,9 +216,9 @@ def test_cli_download_only_with_quiet_mode(tmp_path: Path, capfd):
         web_dir.mkdir(parents=True, exist_ok=True)
 
         # Run the CLI with download_only and quiet mode
-        with patch('sys.argv', ['web2llm', url, '--output', str(output), '--download-only', '--quiet']):
-            args = parse_args()
-            main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
+        monkeypatch.setattr(sys, 'argv', ['web2llm', url, '--output', str(output), '--download-only', '--quiet'])
+        args = arg_parser.parse_args(sys.argv[1:])
+        main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
 
         # Check that the downloader was called correctly
         mock_downloader.assert_called_once_with(quiet=True)
@@ -244,5 +229,32 @@ def test_cli_download_only_with_quiet_mode(tmp_path: Path, capfd):
         assert captured.out == ""
         assert captured.err == ""
 
-        # Clean up
-        shutil.rmtree(downloads_dir.parent)
\ No newline at end of file
+
+@pytest.mark.parametrize("url,expected", [
+    ("https://example.com/docs/", "example.com"),
+    ("http://localhost:8000/index.html", "localhost_8000"),
+    ("not_a_url", ""),
+], ids=["host", "port", "no_netloc"])
+def test_get_website_name(url: str, expected: str):
+    """Test that the download directory name is derived from the URL's netloc."""
+    assert get_website_name(url) == expected
+
+
+def test_cli_cache_dir(
+    mock_website_dir: Path, tmp_path: Path, cwd: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that --cache-dir enables the section cache of the preprocessor."""
+    cache_dir = tmp_path / "cache"
+    args = parse_args(['https://example.com', '--output', str(tmp_path / "out.pdf"),
+                       '--cache-dir', str(cache_dir)])
+    assert args.cache_dir == str(cache_dir)
+
+    # Serve the mock website as the download
+    def download(self, url: str, output_dir: Path) -> Path:
+        return mock_website_dir
+
+    monkeypatch.setattr(WebsiteDownloader, "download", download)
+    main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only,
+         args.cache_dir)
+
+    assert (cache_dir / "content_cache.json").exists()
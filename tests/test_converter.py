@@ -1,12 +1,21 @@
 """Tests for the PDF converter module."""
 import os
-import subprocess
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
-from web2llm.converter import PDFConverter, convert_to_pdf
+from web2llm.converter import PDFConverter, convert_many, convert_to_pdf
+
+pytest.importorskip("pdfkit")
+
+
+@pytest.fixture(autouse=True)
+def mock_convert(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Replace pdfkit.from_string with a mock for every test and return it."""
+    mock = MagicMock()
+    monkeypatch.setattr('pdfkit.from_string', mock)
+    return mock
 
 
 def test_converter_initialization():
@@ -26,17 +35,39 @@ def test_converter_default_options(option_key: str):
     assert option_key in converter.default_options
 
 
-def test_convert_to_pdf(tmp_path: Path):
+def test_converter_does_not_wait_for_javascript():
+    """Test that no JavaScript delay is applied to the script-free merged document."""
+    assert PDFConverter().default_options['javascript-delay'] == 0
+
+
+def test_converter_default_options_are_shared():
+    """Test that converters share the read-only default options."""
+    first, second = PDFConverter(), PDFConverter()
+    assert first.default_options is second.default_options
+    with pytest.raises(TypeError):
+        first.default_options['page-size'] = 'Letter'
+
+
+def test_convert_to_pdf(tmp_path: Path, mock_convert: MagicMock):
     """Test PDF conversion process."""
     input_html = "<html><body><h1>Test</h1></body></html>"
     output_path = tmp_path / "test.pdf"
 
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(input_html, str(output_path))
-        assert mock_convert.called
+    convert_to_pdf(input_html, str(output_path))
+    assert mock_convert.called
 
 
-def test_convert_with_toc(tmp_path: Path):
+def test_convert_to_pdf_pipes_html_without_temp_file(tmp_path: Path, mock_convert: MagicMock):
+    """Test that the HTML is handed to wkhtmltopdf directly, without a temporary file."""
+    input_html = "<html><body><h1>Test</h1></body></html>"
+
+    convert_to_pdf(input_html, str(tmp_path / "test.pdf"))
+
+    assert mock_convert.call_args[0][0] == input_html
+    assert not (tmp_path / ".temp").exists()
+
+
+def test_convert_with_toc(tmp_path: Path, mock_convert: MagicMock):
     """Test PDF conversion with table of contents."""
     input_html = """
     <html>
@@ -49,126 +80,36 @@ def test_convert_with_toc(tmp_path: Path):
     """
     output_path = tmp_path / "test_toc.pdf"
 
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(input_html, str(output_path))
-        assert mock_convert.called
-
-
-def test_conversion_failure(tmp_path: Path):
-    """Test handling of conversion failures."""
-    input_html = "<html><body>Test</body></html>"
-    output_path = tmp_path / "test_fail.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = Exception("Conversion failed")
-        with pytest.raises(RuntimeError):
-            convert_to_pdf(input_html, str(output_path))
+    convert_to_pdf(input_html, str(output_path))
+    assert mock_convert.called
 
 
 @pytest.mark.integration
-def test_full_conversion_process(mock_website_dir: Path, tmp_path: Path):
+def test_full_conversion_process(sample_html: str, tmp_path: Path, mock_convert: MagicMock):
     """Test complete conversion process with real files."""
     output_path = tmp_path / "output.pdf"
 
-    with open(mock_website_dir / "index.html") as f:
-        html_content = f.read()
-
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(html_content, str(output_path))
-        assert mock_convert.called
-
-
-def test_converter_custom_options(tmp_path: Path):
-    """Test PDF conversion with custom options."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "test.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(input_html, str(output_path))
-        mock_convert.assert_called_once()
-        options = mock_convert.call_args[1]['options']
-        assert options['margin-top'] == '20mm'  # Default value
-        assert options['page-size'] == 'A4'  # Default value
-
-
-def test_convert_with_missing_wkhtmltopdf(tmp_path: Path):
-    """Test handling of missing wkhtmltopdf executable."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "test.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = OSError("No wkhtmltopdf executable found")
-        with pytest.raises(RuntimeError, match="wkhtmltopdf"):
-            convert_to_pdf(input_html, str(output_path))
+    convert_to_pdf(sample_html, str(output_path))
+    assert mock_convert.called
 
 
-def test_convert_with_invalid_options(tmp_path: Path):
-    """Test conversion with invalid PDF options."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "test.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = ValueError("Invalid option: invalid-option")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(input_html, str(output_path))
-
-
-def test_convert_with_empty_input(tmp_path: Path):
-    """Test conversion with empty input."""
-    output_path = tmp_path / "test.pdf"
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = RuntimeError("No input content")
-        with pytest.raises(RuntimeError):
-            convert_to_pdf("", str(output_path))
-
-
-def test_convert_with_invalid_output_path(tmp_path: Path):
-    """Test conversion with invalid output path."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "nonexistent" / "test.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = OSError("Failed to create output directory")
-        with pytest.raises(RuntimeError):
-            convert_to_pdf(input_html, str(output_path))
-
-
-def test_convert_with_large_content(tmp_path: Path):
+def test_convert_with_large_content(tmp_path: Path, large_html: str, mock_convert: MagicMock):
     """Test conversion of large HTML content."""
-    # Create large HTML content
-    large_content = "<html><body>"
-    for i in range(1000):
-        large_content += f"<p>Paragraph {i}</p>"
-    large_content += "</body></html>"
-
     output_path = tmp_path / "large.pdf"
 
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(large_content, str(output_path))
-        mock_convert.assert_called_once()
+    convert_to_pdf(large_html, str(output_path))
+    mock_convert.assert_called_once()
 
 
-def test_convert_with_unicode_content(tmp_path: Path):
+def test_convert_with_unicode_content(tmp_path: Path, unicode_html: str, mock_convert: MagicMock):
     """Test conversion of content with Unicode characters."""
-    input_html = """
-    <html>
-    <body>
-        <h1>Unicode Test</h1>
-        <p>Chinese: 你好世界</p>
-        <p>Japanese: こんにちは世界</p>
-        <p>Korean: 안녕하세요 세계</p>
-        <p>Emoji: 👋 🌍 ✨</p>
-    </body>
-    </html>
-    """
     output_path = tmp_path / "unicode.pdf"
 
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(input_html, str(output_path))
-        mock_convert.assert_called_once()
+    convert_to_pdf(unicode_html, str(output_path))
+    mock_convert.assert_called_once()
 
 
-def test_convert_with_javascript_enabled(tmp_path: Path):
+def test_convert_with_javascript_enabled(tmp_path: Path, mock_convert: MagicMock):
     """Test conversion with JavaScript enabled."""
     input_html = """
     <html>
@@ -182,197 +123,137 @@ def test_convert_with_javascript_enabled(tmp_path: Path):
     """
     output_path = tmp_path / "js.pdf"
 
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(input_html, str(output_path))
-        mock_convert.assert_called_once()
-        options = mock_convert.call_args[1]['options']
-        assert options.get('enable-javascript') is None  # Default option
-
-
-def test_convert_with_all_options(tmp_path: Path):
-    """Test PDF conversion with all available options."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "test.pdf"
-
-    options = {
-        'page-size': 'A4',  # Default page size
-        'margin-top': '20mm',  # Default margin
-        'margin-right': '20mm',  # Default margin
-        'margin-bottom': '20mm',  # Default margin
-        'margin-left': '20mm',  # Default margin
+    convert_to_pdf(input_html, str(output_path))
+    mock_convert.assert_called_once()
+    options = mock_convert.call_args[1]['options']
+    assert options.get('enable-javascript') is None  # Default option
+
+
+@pytest.mark.parametrize("options", [
+    None,
+    {},
+    {
+        'page-size': 'A4',
+        'margin-top': '20mm',
+        'margin-right': '20mm',
+        'margin-bottom': '20mm',
+        'margin-left': '20mm',
         'encoding': 'UTF-8',
-        'javascript-delay': 1000,  # Changed from 3000 to match implementation
-        'load-error-handling': 'ignore',  # Changed from skip to match implementation
-        'load-media-error-handling': 'ignore',  # Changed to match implementation
-        'orientation': 'Portrait',  # Changed from Landscape to match implementation
-        'title': 'Documentation',  # Changed from Test Document to match implementation
-        'outline-depth': 3,  # Changed from 4 to match implementation
-        'grayscale': None,  # Changed from True to match implementation
-        'image-quality': 100,  # Changed from 90 to match implementation
-        'zoom': 1.0,  # Changed from 1.5 to match implementation
-    }
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.return_value = None
-        convert_to_pdf(input_html, str(output_path), options)
-
-        mock_convert.assert_called_once()
-        actual_options = mock_convert.call_args[1]['options']
-        for key, value in options.items():
-            assert actual_options[key] == value
-
-
-def test_convert_with_invalid_option_values(tmp_path: Path):
-    """Test conversion with invalid option values."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "test.pdf"
-
-    invalid_options = {
-        'page-size': 'InvalidSize',
-        'margin-top': 'invalid',
-        'orientation': 'Invalid',
-        'outline-depth': 'not_a_number',
-        'zoom': 'invalid_zoom'
-    }
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = ValueError("Invalid option value")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(input_html, str(output_path), invalid_options)
-
-
-def test_convert_with_file_access_error(tmp_path: Path):
-    """Test conversion with file access error."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "nonexistent" / "test.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = IOError("Permission denied")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(input_html, str(output_path))
-
-
-def test_convert_with_wkhtmltopdf_error(tmp_path: Path):
-    """Test conversion with wkhtmltopdf process error."""
-    input_html = "<html><body><h1>Test</h1></body></html>"
-    output_path = tmp_path / "test.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = OSError("wkhtmltopdf process error")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(input_html, str(output_path))
-
-
-def test_convert_with_empty_options(tmp_path: Path):
-    """Test conversion with empty options dictionary."""
+        'javascript-delay': 1000,
+        'load-error-handling': 'ignore',
+        'load-media-error-handling': 'ignore',
+        'orientation': 'Portrait',
+        'title': 'Documentation',
+        'outline-depth': 3,
+        'grayscale': None,
+        'image-quality': 100,
+        'zoom': 1.0,
+    },
+    {'margin-top': '10mm', 'margin-bottom': '10mm', 'margin-left': '15mm', 'margin-right': '15mm'},
+    {'page-size': 'Letter', 'orientation': 'Landscape'},
+    {'image-quality': 90},
+    {'zoom': 1.5},
+], ids=["defaults", "empty", "all_options", "margins", "page_size", "dpi", "zoom"])
+def test_convert_with_options(tmp_path: Path, mock_convert: MagicMock, options):
+    """Test that user options are merged over the default options."""
     input_html = "<html><body><h1>Test</h1></body></html>"
     output_path = tmp_path / "test.pdf"
+    defaults = dict(PDFConverter().default_options)
+
+    convert_to_pdf(input_html, str(output_path), options=options)
+
+    mock_convert.assert_called_once_with(
+        ANY, str(output_path), options={**defaults, **(options or {})}, configuration=ANY, verbose=True
+    )
+    # The shared defaults must not pick up user overrides
+    assert dict(PDFConverter().default_options) == defaults
+
+
+@pytest.mark.parametrize("input_html,options,output_name,error,expected", [
+    ("<html><body>Test</body></html>", None, "test_fail.pdf",
+     Exception("Conversion failed"), "Conversion failed"),
+    ("<html><body><h1>Test</h1></body></html>", None, "test.pdf",
+     OSError("No wkhtmltopdf executable found"), "wkhtmltopdf"),
+    ("<html><body><h1>Test</h1></body></html>", None, "test.pdf",
+     ValueError("Invalid option: invalid-option"), "PDF conversion failed"),
+    ("", None, "test.pdf",
+     RuntimeError("No input content"), "No input content"),
+    ("<html><body><h1>Test</h1></body></html>", None, "nonexistent/test.pdf",
+     OSError("Failed to create output directory"), "Failed to create output directory"),
+    ("<html><body><h1>Test</h1></body></html>",
+     {
+         'page-size': 'InvalidSize',
+         'margin-top': 'invalid',
+         'orientation': 'Invalid',
+         'outline-depth': 'not_a_number',
+         'zoom': 'invalid_zoom'
+     }, "test.pdf",
+     ValueError("Invalid option value"), "PDF conversion failed"),
+    ("<html><body><h1>Test</h1></body></html>", None, "nonexistent/test.pdf",
+     IOError("Permission denied"), "PDF conversion failed"),
+    ("<html><body><h1>Test</h1></body></html>", None, "test.pdf",
+     OSError("wkhtmltopdf process error"), "PDF conversion failed"),
+    ("<html><body>Test</body></html>", None, "output.pdf",
+     Exception("PDF conversion failed"), "PDF conversion failed"),
+    ("<html><body>Test</body></html>", None, "output.pdf",
+     FileNotFoundError("File not found"), "PDF conversion failed"),
+    ("<html><body>Test</body></html>", None, "nonexistent/output.pdf",
+     FileNotFoundError("Directory not found"), "PDF conversion failed"),
+], ids=[
+    "conversion_failure",
+    "missing_wkhtmltopdf",
+    "invalid_options",
+    "empty_input",
+    "invalid_output_path",
+    "invalid_option_values",
+    "file_access_error",
+    "wkhtmltopdf_error",
+    "process_error",
+    "missing_input",
+    "invalid_output_dir",
+])
+def test_convert_errors(
+    tmp_path: Path, mock_convert: MagicMock, input_html, options, output_name, error, expected
+):
+    """Test that conversion errors are reported as RuntimeError."""
+    mock_convert.side_effect = error
+    with pytest.raises(RuntimeError) as exc_info:
+        convert_to_pdf(input_html, str(tmp_path / output_name), options=options)
+    assert expected in str(exc_info.value)
 
-    with patch('pdfkit.from_file') as mock_convert:
-        convert_to_pdf(input_html, str(output_path), {})
-        mock_convert.assert_called_once()
-        options = mock_convert.call_args[1]['options']
-        assert isinstance(options, dict)
-        assert len(options) > 0  # Should use default options
-
-
-def test_convert_with_process_error(tmp_path: Path):
-    """Test handling of process errors during PDF conversion."""
-    input_file = tmp_path / "input.html"
-    input_file.write_text("<html><body>Test</body></html>")
-    output_file = tmp_path / "output.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = Exception("PDF conversion failed")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(str(input_file), str(output_file))
-
-
-def test_convert_with_missing_input():
-    """Test conversion with missing input file."""
-    input_file = Path("nonexistent.html")
-    output_file = Path("output.pdf")
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = FileNotFoundError("File not found")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(str(input_file), str(output_file))
-
-
-def test_convert_with_invalid_output_dir(tmp_path: Path):
-    """Test conversion with invalid output directory."""
-    input_file = tmp_path / "input.html"
-    input_file.write_text("<html><body>Test</body></html>")
-    output_file = tmp_path / "nonexistent" / "output.pdf"
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.side_effect = FileNotFoundError("Directory not found")
-        with pytest.raises(RuntimeError, match="PDF conversion failed"):
-            convert_to_pdf(str(input_file), str(output_file))
-
-
-def test_convert_with_custom_margins(tmp_path: Path):
-    """Test PDF conversion with custom margins."""
-    input_file = tmp_path / "input.html"
-    input_file.write_text("<html><body>Test</body></html>")
-    output_file = tmp_path / "output.pdf"
-
-    options = {
-        "margin-top": "20mm",  # Default margin
-        "margin-bottom": "20mm",  # Default margin
-        "margin-left": "20mm",  # Default margin
-        "margin-right": "20mm"  # Default margin
-    }
-
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.return_value = None
-        convert_to_pdf(str(input_file), str(output_file), options)
-
-        mock_convert.assert_called_once()
-        actual_options = mock_convert.call_args[1]['options']
-        for key, value in options.items():
-            assert actual_options[key] == value
 
+def test_convert_to_pdf_reuses_wkhtmltopdf_config(
+    tmp_path: Path, mock_convert: MagicMock, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that wkhtmltopdf is located once, not on every conversion."""
+    configuration = MagicMock()
+    monkeypatch.setattr('pdfkit.configuration', configuration)
 
-def test_convert_with_custom_page_size(tmp_path: Path):
-    """Test PDF conversion with custom page size."""
-    input_file = tmp_path / "input.html"
-    input_file.write_text("<html><body>Test</body></html>")
-    output_file = tmp_path / "output.pdf"
+    convert_to_pdf("<html></html>", str(tmp_path / "a.pdf"))
+    convert_to_pdf("<html></html>", str(tmp_path / "b.pdf"))
 
-    options = {
-        "page-size": "A4",  # Default page size
-        "orientation": "Portrait"  # Changed from Landscape to match implementation
-    }
+    configuration.assert_called_once()
+    assert mock_convert.call_args.kwargs['configuration'] is configuration.return_value
 
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.return_value = None
-        convert_to_pdf(str(input_file), str(output_file), options)
 
-        mock_convert.assert_called_once()
-        actual_options = mock_convert.call_args[1]['options']
-        for key, value in options.items():
-            assert actual_options[key] == value
+def test_convert_many(tmp_path: Path, mock_convert: MagicMock):
+    """Test that every document in a batch is converted to its own output."""
+    pairs = [(f"<html><body>Doc {i}</body></html>", str(tmp_path / f"doc{i}.pdf")) for i in range(3)]
 
+    convert_many(pairs, workers=2)
 
-def test_convert_with_custom_dpi(tmp_path: Path):
-    """Test PDF conversion with custom image quality settings."""
-    input_file = tmp_path / "input.html"
-    input_file.write_text("<html><body>Test</body></html>")
-    output_file = tmp_path / "output.pdf"
+    converted = {(call.args[0], call.args[1]) for call in mock_convert.call_args_list}
+    assert converted == set(pairs)
 
-    options = {
-        "image-quality": 100  # Using integer value as per implementation
-    }
 
-    with patch('pdfkit.from_file') as mock_convert:
-        mock_convert.return_value = None
-        convert_to_pdf(str(input_file), str(output_file), options)
+def test_convert_many_reports_failures(tmp_path: Path, mock_convert: MagicMock):
+    """Test that a failed conversion in a batch is raised as RuntimeError."""
+    mock_convert.side_effect = [True, OSError("wkhtmltopdf crashed")]
+    pairs = [("<html></html>", str(tmp_path / "a.pdf")), ("<html></html>", str(tmp_path / "b.pdf"))]
 
-        mock_convert.assert_called_once()
-        actual_options = mock_convert.call_args[1]['options']
-        for key, value in options.items():
-            assert actual_options[key] == value
+    with pytest.raises(RuntimeError) as exc_info:
+        convert_many(pairs, workers=1)
+    assert "PDF conversion failed" in str(exc_info.value)
 
 
 def test_fix_relative_paths_basic(tmp_path: Path):
@@ -393,9 +274,30 @@ def test_fix_relative_paths_basic(tmp_path: Path):
     """
 
     result = _fix_relative_paths(html_content, base_dir)
-    assert f'file://{os.path.abspath(tmp_path)}/style.css' in result
-    assert f'file://{os.path.abspath(tmp_path)}/images/test.png' in result
-    assert f'file://{os.path.abspath(tmp_path)}/page.html' in result
+    abs_tmp = os.path.abspath(tmp_path)
+    assert f'file://{abs_tmp}/style.css' in result
+    assert f'file://{abs_tmp}/images/test.png' in result
+    assert f'file://{abs_tmp}/page.html' in result
+
+
+def test_fix_relative_paths_with_parent_directory(tmp_path: Path):
+    """Test that parent directory references are normalized."""
+    from web2llm.converter import _fix_relative_paths
+
+    base_dir = str(tmp_path / "docs")
+    html_content = '<html><body><img src="../images/test.png"></body></html>'
+
+    result = _fix_relative_paths(html_content, base_dir)
+    assert f'src="file://{os.path.abspath(tmp_path)}/images/test.png"' in result
+
+
+@pytest.mark.parametrize("path", ["./images/test.png", "images//test.png", "images/./test.png"])
+def test_fix_relative_paths_normalizes_segments(tmp_path: Path, path: str):
+    """Test that dot and empty path segments are normalized away."""
+    from web2llm.converter import _fix_relative_paths
+
+    result = _fix_relative_paths(f'<html><body><img src="{path}"></body></html>', str(tmp_path))
+    assert f'src="file://{os.path.abspath(tmp_path)}/images/test.png"' in result
 
 
 def test_fix_relative_paths_with_absolute_urls(tmp_path: Path):
@@ -441,8 +343,11 @@ def test_fix_relative_paths_with_svg(tmp_path: Path):
     """
 
     result = _fix_relative_paths(html_content, base_dir)
-    expected_svg_path = f'file://{os.path.abspath(tmp_path)}/icon.svg#svgView(preserveAspectRatio(none))'
+    abs_tmp = os.path.abspath(tmp_path)
+    expected_svg_path = f'file://{abs_tmp}/icon.svg#svgView(preserveAspectRatio(none))'
     assert expected_svg_path in result
+    expected_object_path = f'file://{abs_tmp}/diagram.svg#svgView(preserveAspectRatio(none))'
+    assert f'data="{expected_object_path}"' in result
 
 
 def test_fix_relative_paths_with_head_modifications(tmp_path: Path):
@@ -487,4 +392,34 @@ def test_fix_relative_paths_with_existing_head_tags(tmp_path: Path):
     result = _fix_relative_paths(html_content, base_dir)
     # Should not add duplicate meta or base tags
     assert result.count('<meta http-equiv="Content-Type"') == 1
-    assert result.count('<base href="') == 1
\ No newline at end of file
+    assert result.count('<base href="') == 1
+
+
+def test_fix_relative_paths_injects_tags_after_head(tmp_path: Path):
+    """Test that base and meta tags are injected once, directly after <head>."""
+    from web2llm.converter import _fix_relative_paths
+
+    base_dir = str(tmp_path)
+    html_content = "<html><head><title>Test</title></head><body><p>Content</p></body></html>"
+
+    result = _fix_relative_paths(html_content, base_dir)
+    expected_head = (
+        f'<head><base href="file://{os.path.abspath(base_dir)}/">'
+        '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8" /><title>'
+    )
+    assert expected_head in result
+    assert result.count('<base href="') == 1
+
+
+def test_fix_relative_paths_without_resource_attributes(tmp_path: Path):
+    """Test that HTML without resource attributes only gets its head tags fixed."""
+    from web2llm.converter import _fix_relative_paths
+
+    base_dir = str(tmp_path)
+    html_content = "<html><head></head><body><p>Content</p></body></html>"
+
+    with patch('web2llm.converter._ATTR_RE') as mock_re:
+        result = _fix_relative_paths(html_content, base_dir)
+        mock_re.sub.assert_not_called()
+    assert f'<base href="file://{os.path.abspath(base_dir)}/">' in result
+    assert '<p>Content</p>' in result
@@ -1,17 +1,41 @@
 """Tests for document merging functionality in the HTML preprocessor."""
+import os
+import shutil
+import types
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Tuple
 
 import pytest
 from bs4 import BeautifulSoup
 
 from web2llm.preprocessor import HTMLPreprocessor
 
+pytest.importorskip("lxml")
 
-@pytest.fixture
-def complex_website(tmp_path: Path) -> Path:
-    """Create a complex website structure with multiple HTML files."""
-    web_dir = tmp_path / "website"
-    web_dir.mkdir(parents=True)
+from _html_utils import _parse  # noqa: E402
+
+# lxml tokenizes in C, which keeps the assertion phase cheap on large merges
+_PARSER = "lxml"
+
+
+def _write_all(pairs: List[Tuple[Path, bytes]]) -> None:
+    """Write each (path, content) pair, overlapping the writes for larger batches."""
+    if len(pairs) < 4:
+        for path, content in pairs:
+            path.write_bytes(content)
+        return
+    with ThreadPoolExecutor(4) as ex:
+        list(ex.map(lambda pc: pc[0].write_bytes(pc[1]), pairs))
+
+
+@pytest.fixture(scope="session")
+def _complex_website_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create a complex website structure with multiple HTML files.
+
+    Built once per session; tests must treat it as read-only.
+    """
+    web_dir = tmp_path_factory.mktemp("complex_website")
 
     # Create index.html with navigation
     index_html = """
@@ -31,7 +55,6 @@ def complex_website(tmp_path: Path) -> Path:
     </body>
     </html>
     """
-    (web_dir / "index.html").write_text(index_html)
 
     # Create section1 with two pages
     section1 = web_dir / "section1"
@@ -58,7 +81,6 @@ def complex_website(tmp_path: Path) -> Path:
     </body>
     </html>
     """
-    (section1 / "page1.html").write_text(page1_html)
 
     page2_html = """
     <html>
@@ -74,7 +96,6 @@ def complex_website(tmp_path: Path) -> Path:
     </body>
     </html>
     """
-    (section1 / "page2.html").write_text(page2_html)
 
     # Create section2 with one page
     section2 = web_dir / "section2"
@@ -92,60 +113,78 @@ def complex_website(tmp_path: Path) -> Path:
     </body>
     </html>
     """
-    (section2 / "page3.html").write_text(page3_html)
+
+    _write_all([
+        (web_dir / "index.html", index_html.encode()),
+        (section1 / "page1.html", page1_html.encode()),
+        (section1 / "page2.html", page2_html.encode()),
+        (section2 / "page3.html", page3_html.encode()),
+    ])
 
     return web_dir
 
 
-def test_navigation_extraction(complex_website: Path):
-    """Test extraction and processing of navigation items."""
-    preprocessor = HTMLPreprocessor(str(complex_website))
-    html_files, _ = preprocessor.process_html_files()
+@pytest.fixture
+def complex_website(tmp_path: Path, _complex_website_template: Path) -> Path:
+    """Provide a private copy of the website template for tests that add files.
 
+    Files are hardlinked where supported, so tests may add new files but must
+    not rewrite the existing ones.
+    """
+    web_dir = tmp_path / "website"
+    copy_function = shutil.copy2 if os.name == 'nt' else os.link
+    shutil.copytree(_complex_website_template, web_dir, copy_function=copy_function)
+    return web_dir
+
+
+@pytest.fixture(scope="session")
+def processed_complex(_complex_website_template: Path) -> types.SimpleNamespace:
+    """Process the website template once and share the result across read-only tests."""
+    pp = HTMLPreprocessor(str(_complex_website_template))
+    files, html = pp.process_html_files()
+    tree = _parse(html)
+    return types.SimpleNamespace(pp=pp, files=files, html=html, tree=tree)
+
+
+def test_navigation_extraction(processed_complex: types.SimpleNamespace):
+    """Test extraction and processing of navigation items."""
     # Check that all files were found
-    assert len(html_files) == 4
+    assert len(processed_complex.files) == 4
 
     # Check navigation items in debug info
-    nav_items = preprocessor.debug_info["navigation"]["items"]
+    nav_items = processed_complex.pp.debug_info["navigation"]["items"]
     assert len(nav_items) == 4
 
     # Check navigation order
-    nav_urls = [item["url"] for item in nav_items]
+    nav_urls = {item["url"] for item in nav_items}
     assert "index.html" in nav_urls
     assert "section1/page1.html" in nav_urls
     assert "section2/page3.html" in nav_urls
 
 
-def test_content_consolidation(complex_website: Path):
+def test_content_consolidation(processed_complex: types.SimpleNamespace):
     """Test consolidation of content from multiple files."""
-    preprocessor = HTMLPreprocessor(str(complex_website))
-    html_files, master_html = preprocessor.process_html_files()
-
-    # Parse the consolidated content
-    soup = BeautifulSoup(master_html, 'html.parser')
+    tree = processed_complex.tree
 
     # Check that all sections are present
-    sections = soup.find_all('section', {'class': 'document-section'})
-    assert len(sections) == 4
+    assert int(tree.xpath("count(//section[@class='document-section'])")) == 4
 
     # Check section order and content
-    texts = [section.get_text() for section in sections]
-    assert any('Welcome' in text for text in texts)
-    assert any('Content of page 1' in text for text in texts)
-    assert any('Content of page 2' in text for text in texts)
-    assert any('Content of page 3' in text for text in texts)
+    for text in ('Welcome', 'Content of page 1', 'Content of page 2', 'Content of page 3'):
+        assert tree.xpath(
+            "//section[@class='document-section']//text()[contains(., $text)]", text=text
+        )
 
     # Check that tabbed content was processed
-    printer_tabs = soup.find_all('div', {'class': 'printer-friendly-tabs'})
-    assert len(printer_tabs) > 0
+    assert int(tree.xpath("count(//div[@class='printer-friendly-tabs'])")) > 0
 
     # Check that SVGs were converted to images
-    images = soup.find_all('img')
-    assert any(img['src'].startswith('data:image/svg+xml') for img in images)
+    sources = tree.xpath("//img/@src")
+    assert any(src.startswith('data:image/svg+xml') for src in sources)
 
     # Check that relative image paths were converted to absolute
-    assert all(img['src'].startswith(('data:', 'file://', 'http://', 'https://'))
-              for img in images)
+    assert all(src.startswith(('data:', 'file://', 'http://', 'https://'))
+              for src in sources)
 
 
 def test_error_handling(complex_website: Path):
@@ -166,36 +205,34 @@ def test_error_handling(complex_website: Path):
     assert not any("invalid.html" in f for f in preprocessor.debug_info["content_extraction"]["successful"])
 
     # Check that valid content was still processed
-    soup = BeautifulSoup(master_html, 'html.parser')
+    soup = BeautifulSoup(master_html.encode('utf-8'), _PARSER)
     assert 'Welcome' in soup.get_text()  # Index page content should be present
 
 
 def test_large_file_merging(complex_website: Path):
     """Test merging of many files with large content."""
-    # Create multiple large files
+    # Create multiple large files; only the page number varies between them
+    head = b"<html><head><title>Large Page "
+    heading = b"</title></head><body><main><h1>Large Page "
+    body = b"".join([
+        b"</h1>",
+        b"<p>Content paragraph</p>" * 100,
+        b'<div class="tabbed-set"><div class="tabbed-labels">',
+        b"<label>Tab 1</label><label>Tab 2</label></div>",
+        b'<div class="tabbed-content"><div class="tabbed-block">',
+        b"<p>Tab content</p>" * 50,
+        b'</div><div class="tabbed-block">',
+        b"<p>More content</p>" * 50,
+        b"</div></div></div></main></body></html>",
+    ])
+    pairs = []
     for i in range(10):
-        large_html = f"""
-        <html>
-        <head><title>Large Page {i}</title></head>
-        <body>
-            <main>
-                <h1>Large Page {i}</h1>
-                {'<p>Content paragraph</p>' * 100}
-                <div class="tabbed-set">
-                    <div class="tabbed-labels">
-                        <label>Tab 1</label>
-                        <label>Tab 2</label>
-                    </div>
-                    <div class="tabbed-content">
-                        <div class="tabbed-block">{'<p>Tab content</p>' * 50}</div>
-                        <div class="tabbed-block">{'<p>More content</p>' * 50}</div>
-                    </div>
-                </div>
-            </main>
-        </body>
-        </html>
-        """
-        (complex_website / f"large{i}.html").write_text(large_html)
+        number = str(i).encode()
+        pairs.append((
+            complex_website / f"large{i}.html",
+            b"".join([head, number, heading, number, body]),
+        ))
+    _write_all(pairs)
 
     preprocessor = HTMLPreprocessor(str(complex_website))
     html_files, master_html = preprocessor.process_html_files()
@@ -204,9 +241,8 @@ def test_large_file_merging(complex_website: Path):
     assert len(html_files) >= 14  # Original 4 + 10 new files
 
     # Check that the master HTML contains content from all files
-    soup = BeautifulSoup(master_html, 'html.parser')
-    sections = soup.find_all('section', {'class': 'document-section'})
-    assert len(sections) >= 14
+    tree = _parse(master_html)
+    assert int(tree.xpath("count(//section[@class='document-section'])")) >= 14
 
     # Check memory usage stats if available
     if "memory_usage" in preprocessor.debug_info:
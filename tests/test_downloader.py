@@ -1,9 +1,13 @@
 """Tests for the website downloader module."""
+import subprocess
+import sys
 from pathlib import Path
+from typing import Optional
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from _html_utils import _names
 from web2llm.downloader import WebsiteDownloader
 
 
@@ -13,42 +17,95 @@ def test_downloader_initialization():
     assert downloader.quiet is True
 
 
-@pytest.mark.integration
-def test_download_website(tmp_path: Path):
-    """Test downloading a website."""
-    url = "https://example.com"
+@pytest.mark.parametrize("url,returncode,lines,expected_arg,error", [
+    pytest.param("https://example.com", 0, [""], None, None,
+                 id="website", marks=pytest.mark.integration),
+    pytest.param("https://example.com", 0, [""], '-r2', None, id="custom_depth"),
+    pytest.param("https://example.com", 0, [""], '-r2', None, id="custom_extensions"),
+    pytest.param("https://example.com", 0, [""], 'Mozilla/5.0', None, id="custom_user_agent"),
+    pytest.param("https://example.com/über/straße", 0, [""], None, None, id="unicode_url"),
+    pytest.param("https://example.com", 1, ["Connection refused"], None,
+                 "HTTrack failed with return code", id="connection_error"),
+    pytest.param("https://example.com", 1, ["Error: Process failed"], None,
+                 "HTTrack failed with return code", id="process_error"),
+])
+def test_download_behavior(
+    tmp_path: Path,
+    httrack,
+    url: str,
+    returncode: int,
+    lines: list,
+    expected_arg: Optional[str],
+    error: Optional[str],
+):
+    """Test download results and failures for different HTTrack outcomes."""
     output_dir = tmp_path / "downloaded"
     web_dir = output_dir / "web"
-    web_dir.mkdir(parents=True)
+    if error is None:
+        web_dir.mkdir(parents=True)
+
+    args = httrack(rc=returncode, lines=lines)
 
     downloader = WebsiteDownloader(quiet=True)
 
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["", None]
-        mock_process.poll.return_value = 0
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        result = downloader.download(url, output_dir)
+    if error is not None:
+        with pytest.raises(RuntimeError) as exc_info:
+            downloader.download(url, output_dir)
+        assert error in str(exc_info.value)
+        return
+
+    result = downloader.download(url, output_dir)
+
+    assert result == web_dir
+    assert len(args) == 1
+    if expected_arg is not None:
+        assert expected_arg in args[0][0]
+
+
+@pytest.mark.parametrize("quiet,existing_mirror", [
+    (True, False),
+    (False, True),
+], ids=["quiet_fresh", "verbose_update"])
+def test_download_command_flags(tmp_path: Path, httrack, quiet: bool, existing_mirror: bool):
+    """Test the connection, update and verbosity flags passed to HTTrack."""
+    output_dir = tmp_path / "downloaded"
+    if existing_mirror:
+        (output_dir / "web").mkdir(parents=True)
+    args = httrack()
+
+    downloader = WebsiteDownloader(quiet=quiet, connections=4)
+    try:
+        downloader.download("https://example.com", output_dir)
+    except RuntimeError:
+        pass  # The stand-in HTTrack writes nothing, so a fresh download finds no web directory
+
+    cmd = args[0][0]
+    assert "-c4" in cmd
+    assert "-T30" in cmd
+    assert ("--update" in cmd) == existing_mirror
+    assert ("-%v" in cmd) == (not quiet)
+
 
-        assert result == web_dir
-        mock_run.assert_called_once()
+def test_download_default_connections(tmp_path: Path, httrack):
+    """Test that HTTrack keeps its own default of 8 connections unless raised."""
+    args = httrack()
 
+    with pytest.raises(RuntimeError):
+        WebsiteDownloader(quiet=True).download("https://example.com", tmp_path / "downloaded")
 
-def test_download_failure(tmp_path: Path):
+    assert "-c8" in args[0][0]
+
+
+def test_download_failure(tmp_path: Path, httrack):
     """Test handling of download failures."""
     url = "https://example.com"
     output_dir = tmp_path / "downloaded"
+    httrack(rc=1)
 
     downloader = WebsiteDownloader(quiet=True)
 
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["", None]
-        mock_process.poll.return_value = 1
-        mock_run.return_value = mock_process
-        with pytest.raises(RuntimeError):
-            downloader.download(url, output_dir)
+    with pytest.raises(RuntimeError):
+        downloader.download(url, output_dir)
 
 
 def test_find_html_files(tmp_path: Path):
@@ -64,7 +121,7 @@ def test_find_html_files(tmp_path: Path):
     html_files = downloader.find_html_files(website_dir)
 
     assert len(html_files) == 2
-    assert any("index.html" in str(f) for f in html_files)
+    assert "index.html" in _names(html_files)
 
 
 def test_downloader_initialization_with_options():
@@ -73,75 +130,6 @@ def test_downloader_initialization_with_options():
     assert downloader.quiet is True
 
 
-def test_download_with_custom_depth(tmp_path: Path):
-    """Test downloading with custom depth setting."""
-    url = "https://example.com"
-    output_dir = tmp_path / "downloaded"
-    web_dir = output_dir / "web"
-    web_dir.mkdir(parents=True)
-
-    downloader = WebsiteDownloader(quiet=True)
-
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["", None]
-        mock_process.poll.return_value = 0
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        result = downloader.download(url, output_dir)
-
-        assert result == web_dir
-        mock_run.assert_called_once()
-        cmd = mock_run.call_args[0][0]
-        assert '-r2' in cmd  # Default depth
-
-
-def test_download_with_custom_extensions(tmp_path: Path):
-    """Test downloading with custom file extensions."""
-    url = "https://example.com"
-    output_dir = tmp_path / "downloaded"
-    web_dir = output_dir / "web"
-    web_dir.mkdir(parents=True)
-
-    downloader = WebsiteDownloader(quiet=True)
-
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["", None]
-        mock_process.poll.return_value = 0
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        result = downloader.download(url, output_dir)
-
-        assert result == web_dir
-        mock_run.assert_called_once()
-        cmd = mock_run.call_args[0][0]
-        assert '-r2' in cmd  # Default depth
-
-
-def test_download_with_custom_user_agent(tmp_path: Path):
-    """Test downloading with custom user agent."""
-    url = "https://example.com"
-    output_dir = tmp_path / "downloaded"
-    web_dir = output_dir / "web"
-    web_dir.mkdir(parents=True)
-
-    downloader = WebsiteDownloader(quiet=True)
-
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["", None]
-        mock_process.poll.return_value = 0
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        result = downloader.download(url, output_dir)
-
-        assert result == web_dir
-        mock_run.assert_called_once()
-        cmd = mock_run.call_args[0][0]
-        assert 'Mozilla/5.0' in cmd  # Default user agent
-
-
 def test_download_with_invalid_url():
     """Test downloading with invalid URL."""
     url = "not_a_url"
@@ -149,25 +137,9 @@ def test_download_with_invalid_url():
 
     downloader = WebsiteDownloader()
 
-    with pytest.raises(RuntimeError, match="Could not find downloaded website directory"):
+    with pytest.raises(RuntimeError) as exc_info:
         downloader.download(url, output_dir)
-
-
-def test_download_with_connection_error(tmp_path: Path):
-    """Test handling of connection errors during download."""
-    url = "https://example.com"
-    output_dir = tmp_path / "downloaded"
-
-    downloader = WebsiteDownloader()
-
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["Connection refused", None]
-        mock_process.poll.return_value = 1
-        mock_process.returncode = 1
-        mock_run.return_value = mock_process
-        with pytest.raises(RuntimeError, match="HTTrack failed with return code"):
-            downloader.download(url, output_dir)
+    assert "Could not find downloaded website directory" in str(exc_info.value)
 
 
 def test_download_with_permission_error(tmp_path: Path):
@@ -210,25 +182,20 @@ def test_find_html_files_with_subdirectories(tmp_path: Path):
     html_files = downloader.find_html_files(website_dir)
 
     assert len(html_files) == 2
-    assert any("index.html" in str(f) for f in html_files)
-    assert any("page.html" in str(f) for f in html_files)
+    assert "index.html" in _names(html_files)
+    assert "page.html" in _names(html_files)
 
 
-def test_download_with_process_error(tmp_path: Path):
-    """Test handling of process errors during download."""
-    url = "https://example.com"
-    output_dir = tmp_path / "downloaded"
+def test_find_html_files_skips_directories_named_html(tmp_path: Path):
+    """Test that only files are returned, even when a directory ends in .html."""
+    website_dir = tmp_path / "web"
+    (website_dir / "archive.html").mkdir(parents=True)
+    (website_dir / "archive.html" / "page.html").touch()
 
-    downloader = WebsiteDownloader()
+    downloader = WebsiteDownloader(quiet=True)
+    html_files = downloader.find_html_files(website_dir)
 
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["Error: Process failed", None]
-        mock_process.poll.return_value = 1
-        mock_process.returncode = 1
-        mock_run.return_value = mock_process
-        with pytest.raises(RuntimeError, match="HTTrack failed with return code"):
-            downloader.download(url, output_dir)
+    assert html_files == [website_dir / "archive.html" / "page.html"]
 
 
 def test_download_with_output_error(tmp_path: Path):
@@ -250,8 +217,9 @@ def test_download_with_empty_url():
 
     downloader = WebsiteDownloader()
 
-    with pytest.raises(RuntimeError, match="Could not find downloaded website directory"):
+    with pytest.raises(RuntimeError) as exc_info:
         downloader.download(url, output_dir)
+    assert "Could not find downloaded website directory" in str(exc_info.value)
 
 
 def test_download_with_process_timeout(tmp_path: Path):
@@ -263,32 +231,12 @@ def test_download_with_process_timeout(tmp_path: Path):
 
     with patch('subprocess.Popen') as mock_run:
         mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = TimeoutError("Process timed out")
+        mock_process.stdout.read1.side_effect = TimeoutError("Process timed out")
         mock_process.poll.return_value = None
         mock_run.return_value = mock_process
-        with pytest.raises(TimeoutError, match="Process timed out"):
+        with pytest.raises(TimeoutError) as exc_info:
             downloader.download(url, output_dir)
-
-
-def test_download_with_unicode_url(tmp_path: Path):
-    """Test downloading with URL containing Unicode characters."""
-    url = "https://example.com/über/straße"
-    output_dir = tmp_path / "downloaded"
-    web_dir = output_dir / "web"
-    web_dir.mkdir(parents=True)
-
-    downloader = WebsiteDownloader(quiet=True)
-
-    with patch('subprocess.Popen') as mock_run:
-        mock_process = MagicMock()
-        mock_process.stdout.readline.side_effect = ["", None]
-        mock_process.poll.return_value = 0
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        result = downloader.download(url, output_dir)
-
-        assert result == web_dir
-        mock_run.assert_called_once()
+        assert "Process timed out" in str(exc_info.value)
 
 
 def test_downloader_quiet_mode_print_progress(capsys):
@@ -311,4 +259,74 @@ def test_downloader_quiet_mode_print_progress(capsys):
 
     # Check that nothing was printed
     captured = capsys.readouterr()
-    assert captured.out == ""  # No output in quiet mode
\ No newline at end of file
+    assert captured.out == ""  # No output in quiet mode
+
+
+def test_print_progress_flushes_in_batches(capsys, monkeypatch: pytest.MonkeyPatch):
+    """Test that progress output is flushed per batch and on status lines."""
+    downloader = WebsiteDownloader()
+    flushes = []
+    monkeypatch.setattr(sys.stdout, "flush", lambda: flushes.append(True))
+
+    for i in range(63):
+        downloader._print_progress(f"Loading: page{i}.html")
+    assert not flushes
+
+    downloader._print_progress("Loading: page63.html")
+    assert len(flushes) == 1
+
+    downloader._print_progress("Warning: slow response")
+    assert len(flushes) == 2
+    assert "page63.html" in capsys.readouterr().out
+
+
+def test_download_streams_carriage_return_progress(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a redraw ending in a bare carriage return arrives before any newline."""
+    output_dir = tmp_path / "downloaded"
+    (output_dir / "web").mkdir(parents=True)
+    signal = tmp_path / "received"
+    # Stand-in for HTTrack: redraw a line, then wait until the reader has seen it
+    script = (
+        "import os, sys, time\n"
+        "sys.stdout.buffer.write(b'Loading: a.html\\r'); sys.stdout.flush()\n"
+        "for _ in range(100):\n"
+        f"    if os.path.exists({str(signal)!r}): break\n"
+        "    time.sleep(0.05)\n"
+        "else:\n"
+        "    sys.exit(3)\n"
+        "sys.stdout.buffer.write(b'Saved: caf\\xe9.html\\n')\n"
+    )
+    real_popen = subprocess.Popen
+    monkeypatch.setattr(
+        subprocess, 'Popen',
+        lambda cmd, **kwargs: real_popen([sys.executable, '-c', script], **kwargs),
+    )
+
+    downloader = WebsiteDownloader()
+    received = []
+
+    def print_progress(line: str) -> None:
+        if line.strip():
+            received.append(line.strip())
+            signal.touch()
+
+    monkeypatch.setattr(downloader, '_print_progress', print_progress)
+    downloader.download("https://example.com", output_dir)
+
+    assert received == ["Loading: a.html", "Saved: caf\ufffd.html"]
+
+
+def test_download_joins_lines_split_across_chunks(tmp_path: Path, httrack, monkeypatch):
+    """Test that partial lines and split \\r\\n pairs are reassembled before printing."""
+    output_dir = tmp_path / "downloaded"
+    (output_dir / "web").mkdir(parents=True)
+    httrack(lines=[b"Loading: a.ht", b"ml\r", b"\nSaved: b.html\r\n", b"Done"])
+
+    downloader = WebsiteDownloader()
+    received = []
+    monkeypatch.setattr(downloader, '_print_progress', received.append)
+    downloader.download("https://example.com", output_dir)
+
+    assert received == ["Loading: a.html", "Saved: b.html", "Done"]
@@ -4,6 +4,8 @@ from pathlib import Path
 import pytest
 from bs4 import BeautifulSoup
 
+from _html_utils import _names, _svg_markup
+from web2llm import preprocessor as preprocessor_module
 from web2llm.preprocessor import HTMLPreprocessor
 
 
@@ -12,6 +14,17 @@ def test_preprocessor_initialization(mock_website_dir: Path):
     preprocessor = HTMLPreprocessor(str(mock_website_dir))
     assert preprocessor.base_dir == str(mock_website_dir)
     assert preprocessor.debug_dir is None
+    assert preprocessor.parser == 'lxml'
+
+
+def test_preprocessor_with_html_parser(mock_website_dir: Path):
+    """Test that documents can still be parsed with the pure-Python html.parser."""
+    preprocessor = HTMLPreprocessor(str(mock_website_dir), parser='html.parser')
+    html_files, master_html = preprocessor.process_html_files()
+
+    assert len(html_files) == 3
+    assert len(preprocessor.debug_info["content_extraction"]["successful"]) == 3
+    assert 'Content for page 1' in master_html
 
 
 def test_find_html_files(mock_website_dir: Path):
@@ -20,16 +33,7 @@ def test_find_html_files(mock_website_dir: Path):
     html_files, _ = preprocessor.process_html_files()
 
     assert len(html_files) == 3  # index.html + 2 subpages
-    assert any("index.html" in str(f) for f in html_files)
-
-
-def test_normalize_url():
-    """Test URL normalization."""
-    preprocessor = HTMLPreprocessor("dummy_path")
-    test_url = "https://example.com/index.html"
-    normalized = preprocessor._normalize_url(test_url)
-    assert isinstance(normalized, str)
-    assert normalized == "https://example.com"
+    assert "index.html" in _names(html_files)
 
 
 def test_consolidate_html(mock_website_dir: Path):
@@ -56,6 +60,116 @@ def test_debug_output(tmp_path: Path, mock_website_dir: Path):
     assert (debug_dir / "master.html").read_text() == master_html
 
 
+@pytest.mark.parametrize("use_orjson", [True, False], ids=["orjson", "stdlib"])
+def test_debug_json_output(
+    tmp_path: Path, mock_website_dir: Path, monkeypatch: pytest.MonkeyPatch, use_orjson: bool
+):
+    """Test that the debug JSON round-trips with and without the optional encoder."""
+    import json
+
+    import web2llm.preprocessor as preprocessor_module
+
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(preprocessor_module, "orjson", None)
+    debug_dir = tmp_path / "debug"
+    preprocessor = HTMLPreprocessor(str(mock_website_dir), str(debug_dir))
+    preprocessor.process_html_files()
+
+    content = (debug_dir / "preprocessor_debug.json").read_text(encoding="utf-8")
+    assert json.loads(content) == preprocessor.debug_info
+    assert content.startswith('{\n  "')
+
+
+@pytest.mark.parametrize("debug", [False, True], ids=["quiet", "debug"])
+def test_file_trace_only_in_debug_mode(tmp_path: Path, capsys, debug: bool):
+    """Test that per-file progress is printed in debug mode, a summary otherwise."""
+    web_dir = tmp_path / "web"
+    web_dir.mkdir()
+    (web_dir / "index.html").write_text("<html><body><main>Home</main></body></html>")
+    (web_dir / "style.css").write_text("body {}")
+    debug_dir = str(tmp_path / "debug") if debug else None
+
+    HTMLPreprocessor(str(web_dir), debug_dir).process_html_files()
+
+    out = capsys.readouterr().out
+    assert "Found 1 HTML files" in out
+    assert ("Adding HTML file" in out) == debug
+    assert ("Skipping non-HTML file" in out) == debug
+    assert ("Processing remaining file" in out) == debug
+
+
+def test_content_cache_reuses_unchanged_files(
+    tmp_path: Path, mock_website_dir: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that a second run over unchanged files is served from the content cache."""
+    cache_dir = tmp_path / "cache"
+    preprocessor = HTMLPreprocessor(str(mock_website_dir), cache_dir=str(cache_dir))
+    _, first_html = preprocessor.process_html_files()
+    assert (cache_dir / "content_cache.json").exists()
+
+    def fail(self, file_path, nav_text=None):
+        raise AssertionError(f"{file_path} should have been served from the cache")
+
+    monkeypatch.setattr(HTMLPreprocessor, "_extract_section", fail)
+    preprocessor = HTMLPreprocessor(str(mock_website_dir), cache_dir=str(cache_dir))
+    _, second_html = preprocessor.process_html_files()
+
+    assert second_html == first_html
+    assert len(preprocessor.debug_info["content_extraction"]["successful"]) == 3
+
+
+def test_content_cache_misses_changed_files(tmp_path: Path):
+    """Test that editing a file invalidates its cached section."""
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+    test_file = test_dir / "index.html"
+    test_file.write_text("<html><body><main>Old content</main></body></html>")
+    cache_dir = tmp_path / "cache"
+
+    HTMLPreprocessor(str(test_dir), cache_dir=str(cache_dir)).process_html_files()
+    test_file.write_text("<html><body><main>New content</main></body></html>")
+    _, master_html = HTMLPreprocessor(str(test_dir), cache_dir=str(cache_dir)).process_html_files()
+
+    assert "New content" in master_html
+    assert "Old content" not in master_html
+
+
+def test_content_cache_keeps_only_current_entries(tmp_path: Path):
+    """Test that the saved cache drops sections of earlier file revisions."""
+    import json
+
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+    test_file = test_dir / "index.html"
+    cache_dir = tmp_path / "cache"
+
+    for revision in range(5):
+        test_file.write_text(f"<html><body><main>Revision {revision}</main></body></html>")
+        HTMLPreprocessor(str(test_dir), cache_dir=str(cache_dir)).process_html_files()
+        cache = json.loads((cache_dir / "content_cache.json").read_text())
+        assert len(cache) == 1
+        assert f"Revision {revision}" in next(iter(cache.values()))["content"]
+
+
+def test_content_cache_with_relative_base_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Test that a relative base directory misses the cache after changing directory."""
+    html = '<html><body><main><img src="logo.png"></main></body></html>'
+    for checkout in ("first", "second"):
+        (tmp_path / checkout / "site").mkdir(parents=True)
+        (tmp_path / checkout / "site" / "index.html").write_text(html)
+    cache_dir = str(tmp_path / "cache")
+
+    monkeypatch.chdir(tmp_path / "first")
+    HTMLPreprocessor("site", cache_dir=cache_dir).process_html_files()
+    monkeypatch.chdir(tmp_path / "second")
+    _, master_html = HTMLPreprocessor("site", cache_dir=cache_dir).process_html_files()
+
+    assert f"file://{tmp_path / 'second' / 'site' / 'logo.png'}" in master_html
+    assert str(tmp_path / "first") not in master_html
+
+
 def test_preprocessor_with_empty_directory(tmp_path: Path):
     """Test preprocessor with an empty directory."""
     empty_dir = tmp_path / "empty"
@@ -87,11 +201,8 @@ def test_preprocessor_with_non_html_files(tmp_path: Path):
     assert soup.find('title').text == 'Combined Documentation'
 
 
-def test_preprocessor_with_missing_content_elements(tmp_path: Path):
+def test_preprocessor_with_missing_content_elements(memory_preprocessor):
     """Test preprocessor with HTML files missing main content elements."""
-    test_dir = tmp_path / "test"
-    test_dir.mkdir()
-
     # Create HTML without main/article/content elements
     html_content = """
     <html>
@@ -102,9 +213,7 @@ def test_preprocessor_with_missing_content_elements(tmp_path: Path):
     </body>
     </html>
     """
-    (test_dir / "test.html").write_text(html_content)
-
-    preprocessor = HTMLPreprocessor(str(test_dir))
+    preprocessor = memory_preprocessor({"test.html": html_content})
     html_files, master_html = preprocessor.process_html_files()
 
     assert len(html_files) == 1
@@ -115,6 +224,112 @@ def test_preprocessor_with_missing_content_elements(tmp_path: Path):
     assert "Footer" in section.text
 
 
+@pytest.mark.parametrize("names,expected", [
+    (["docs/page.html", "docs/index.html", "index.html"], "Docs"),
+    ([".html", "index.html"], "Bare"),
+    (["index.html", ".html"], "Index"),
+], ids=["nested_first", "bare_first", "index_first"])
+def test_main_file_is_first_index_found(memory_preprocessor, names: list, expected: str):
+    """Test that navigation is read from the first index.html or .html file found."""
+    labels = {"docs/index.html": "Docs", ".html": "Bare", "index.html": "Index"}
+    files = {
+        name: f'<html><body><nav class="md-nav"><a href="{name}" class="md-nav__link">'
+              f'{labels.get(name, "Page")}</a></nav><main>{name}</main></body></html>'
+        for name in names
+    }
+    preprocessor = memory_preprocessor(files)
+    preprocessor.process_html_files()
+
+    assert [item["text"] for item in preprocessor.debug_info["navigation"]["items"]] == [expected]
+
+
+def test_memory_files_on_large_sites(memory_preprocessor):
+    """Test that files served through _fs_read are extracted beyond the pool threshold."""
+    files = {f"page{i}.html": f"<html><body><main>Page {i}</main></body></html>" for i in range(40)}
+    preprocessor = memory_preprocessor(files)
+    html_files, master_html = preprocessor.process_html_files()
+
+    assert len(html_files) == 40
+    assert master_html.count('class="document-section"') == 40
+    assert not preprocessor.debug_info["content_extraction"]["failed"]
+
+
+class _RewritingPreprocessor(HTMLPreprocessor):
+    """Preprocessor that only overrides the file read hook."""
+
+    def _fs_read(self, file_path: str) -> bytes:
+        return super()._fs_read(file_path).replace(b"on disk", b"served")
+
+
+def test_fs_read_override_on_large_sites(tmp_path: Path):
+    """Test that an _fs_read override is honoured beyond the pool threshold."""
+    for i in range(40):
+        html = f"<html><body><main>Page {i} on disk</main></body></html>"
+        (tmp_path / f"page{i}.html").write_text(html)
+
+    html_files, master_html = _RewritingPreprocessor(str(tmp_path)).process_html_files()
+
+    assert len(html_files) == 40
+    assert master_html.count("served") == 40
+    assert "on disk" not in master_html
+
+
+def test_unpicklable_subclass_on_large_sites(tmp_path: Path):
+    """Test that a subclass the pool cannot pickle still extracts every file."""
+    class LocalPreprocessor(HTMLPreprocessor):
+        def _fix_resource_paths(self, soup, file_path, html_text=None):
+            super()._fix_resource_paths(soup, file_path, html_text)
+
+    for i in range(46):
+        (tmp_path / f"page{i}.html").write_text(f"<html><body><main>Page {i}</main></body></html>")
+
+    html_files, master_html = LocalPreprocessor(str(tmp_path)).process_html_files()
+
+    assert len(html_files) == 46
+    assert master_html.count('class="document-section"') == 46
+
+
+def test_unavailable_process_pool_on_large_sites(tmp_path: Path, monkeypatch):
+    """Test that files are extracted in-process when the pool cannot start."""
+    def no_pool(*args, **kwargs):
+        raise PermissionError("no /dev/shm")
+
+    monkeypatch.setattr(preprocessor_module, "ProcessPoolExecutor", no_pool)
+    for i in range(40):
+        (tmp_path / f"page{i}.html").write_text(f"<html><body><main>Page {i}</main></body></html>")
+
+    html_files, master_html = HTMLPreprocessor(str(tmp_path)).process_html_files()
+
+    assert len(html_files) == 40
+    assert master_html.count('class="document-section"') == 40
+
+
+def test_process_pool_started_once_per_run(tmp_path: Path, monkeypatch):
+    """Test that the navigation and remaining batches share one process pool."""
+    pools = []
+
+    class CountingPool(preprocessor_module.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(preprocessor_module, "ProcessPoolExecutor", CountingPool)
+    links = "".join(f'<a href="nav{i}.html" class="md-nav__link">Nav {i}</a>' for i in range(32))
+    (tmp_path / "index.html").write_text(
+        f"<html><body><nav>{links}</nav><main>Home</main></body></html>"
+    )
+    for prefix in ("nav", "other"):
+        for i in range(32):
+            html = f"<html><body><main>{prefix} {i}</main></body></html>"
+            (tmp_path / f"{prefix}{i}.html").write_text(html)
+
+    html_files, master_html = HTMLPreprocessor(str(tmp_path)).process_html_files()
+
+    assert len(html_files) == 65
+    assert master_html.count('class="document-section"') == 65
+    assert len(pools) == 1
+
+
 def test_preprocessor_with_duplicate_navigation(tmp_path: Path):
     """Test preprocessor with duplicate navigation items."""
     test_dir = tmp_path / "test"
@@ -215,6 +430,28 @@ def test_preprocessor_with_special_characters(tmp_path: Path):
     assert "Emojis:" in master_html
 
 
+def test_section_attributes_are_escaped(memory_preprocessor):
+    """Test that file names and navigation labels survive as section attributes."""
+    index_html = """
+    <html><body>
+        <nav class="md-nav">
+            <a href="a&amp;b.html" class="md-nav__link">Tom &amp; "Jerry" &lt;it's&gt;</a>
+        </nav>
+        <main>Index</main>
+    </body></html>
+    """
+    preprocessor = memory_preprocessor({
+        "index.html": index_html,
+        "a&b.html": "<html><body><main>Page</main></body></html>",
+    })
+    _, master_html = preprocessor.process_html_files()
+
+    soup = BeautifulSoup(master_html, 'html.parser')
+    section = soup.find('section', attrs={'data-source': 'a&b.html'})
+    assert section is not None
+    assert section['data-nav-text'] == 'Tom & "Jerry" <it\'s>'
+
+
 def test_preprocessor_with_large_navigation(tmp_path: Path):
     """Test preprocessor with a large number of navigation items."""
     test_dir = tmp_path / "test"
@@ -256,11 +493,8 @@ def test_preprocessor_with_large_navigation(tmp_path: Path):
     assert len(preprocessor.debug_info["navigation"]["items"]) == 100
 
 
-def test_preprocessor_with_nested_content(tmp_path: Path):
+def test_preprocessor_with_nested_content(memory_preprocessor):
     """Test preprocessor with deeply nested content elements."""
-    test_dir = tmp_path / "test"
-    test_dir.mkdir()
-
     # Create HTML with nested content
     html_content = """
     <html>
@@ -280,20 +514,15 @@ def test_preprocessor_with_nested_content(tmp_path: Path):
     </body>
     </html>
     """
-    (test_dir / "nested.html").write_text(html_content)
-
-    preprocessor = HTMLPreprocessor(str(test_dir))
+    preprocessor = memory_preprocessor({"nested.html": html_content})
     html_files, master_html = preprocessor.process_html_files()
 
     assert len(html_files) == 1
     assert "Deeply nested content" in master_html
 
 
-def test_preprocessor_with_details_elements(tmp_path: Path):
+def test_preprocessor_with_details_elements(memory_preprocessor):
     """Test preprocessor with details elements."""
-    test_dir = tmp_path / "test"
-    test_dir.mkdir()
-
     html_content = """
     <html>
     <head><title>Test</title></head>
@@ -309,9 +538,7 @@ def test_preprocessor_with_details_elements(tmp_path: Path):
     </body>
     </html>
     """
-    (test_dir / "test.html").write_text(html_content)
-
-    preprocessor = HTMLPreprocessor(str(test_dir))
+    preprocessor = memory_preprocessor({"test.html": html_content})
     html_files, master_html = preprocessor.process_html_files()
 
     assert len(html_files) == 1
@@ -321,6 +548,50 @@ def test_preprocessor_with_details_elements(tmp_path: Path):
     assert all(d.get('open') == 'open' for d in details)
 
 
+def test_details_custom_elements_are_not_opened(memory_preprocessor):
+    """Test that only real <details> tags, not details-* custom elements, are opened."""
+    html_content = """
+    <html>
+    <body>
+        <main>
+            <details-menu role="menu"><p>Menu</p></details-menu>
+            <details><summary>Section</summary><p>Content</p></details>
+        </main>
+    </body>
+    </html>
+    """
+    preprocessor = memory_preprocessor({"test.html": html_content})
+    html_files, master_html = preprocessor.process_html_files()
+
+    assert '<details-menu role="menu">' in master_html
+    assert '<details open="open">' in master_html
+    soup = BeautifulSoup(master_html, 'html.parser')
+    assert soup.find('details-menu').get('open') is None
+
+
+def test_details_open_inside_attribute_values(memory_preprocessor):
+    """Test that "open" inside another attribute's value does not count as an open attribute."""
+    html_content = """
+    <html>
+    <body>
+        <main>
+            <details class="a open b"><summary>Classed</summary><p>One</p></details>
+            <details title="click to open it"><summary>Titled</summary><p>Two</p></details>
+        </main>
+    </body>
+    </html>
+    """
+    preprocessor = memory_preprocessor({"test.html": html_content})
+    html_files, master_html = preprocessor.process_html_files()
+
+    soup = BeautifulSoup(master_html, 'html.parser')
+    details = soup.find_all('details')
+    assert len(details) == 2
+    assert all(element.get('open') == 'open' for element in details)
+    assert details[0]['class'] == ['a', 'open', 'b']
+    assert details[1]['title'] == "click to open it"
+
+
 def test_preprocessor_with_resource_paths(tmp_path: Path):
     """Test preprocessing of various resource paths."""
     test_dir = tmp_path / "test"
@@ -381,6 +652,52 @@ def test_preprocessor_with_navigation_errors(tmp_path: Path):
     assert len(preprocessor.debug_info["navigation"]["items"]) == 1  # Only valid link should be included
 
 
+def test_navigation_with_crlf_line_endings(tmp_path: Path):
+    """Test that navigation read from raw bytes handles Windows line endings."""
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+
+    html_content = (
+        '<html>\r\n<body>\r\n<nav class="md-nav">\r\n'
+        '<a href="page.html" class="md-nav__link">\r\n  Page\r\n</a>\r\n'
+        '</nav>\r\n<main>Content</main>\r\n</body>\r\n</html>\r\n'
+    )
+    (test_dir / "index.html").write_bytes(html_content.encode('utf-8'))
+
+    preprocessor = HTMLPreprocessor(str(test_dir))
+    preprocessor.process_html_files()
+
+    assert preprocessor.debug_info["navigation"]["items"] == [{"url": "page.html", "text": "Page"}]
+
+
+def test_navigation_text_skips_script_and_style(tmp_path: Path):
+    """Test that script and style code inside a navigation link is not part of its text."""
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+
+    html_content = """
+    <html>
+    <body>
+        <nav class="md-nav">
+            <a href="page.html" class="md-nav__link">
+                <script>track("page")</script><style>.icon { color: red; }</style>
+                Page <b>One</b>
+            </a>
+        </nav>
+        <main>Content</main>
+    </body>
+    </html>
+    """
+    (test_dir / "index.html").write_text(html_content)
+
+    preprocessor = HTMLPreprocessor(str(test_dir))
+    preprocessor.process_html_files()
+
+    assert preprocessor.debug_info["navigation"]["items"] == [
+        {"url": "page.html", "text": "PageOne"}
+    ]
+
+
 def test_preprocessor_with_file_errors(tmp_path: Path):
     """Test preprocessor with file reading errors."""
     test_dir = tmp_path / "test"
@@ -474,6 +791,23 @@ def test_preprocessor_with_empty_html(tmp_path: Path):
     assert len(preprocessor.debug_info["content_extraction"]["empty"]) == 1
 
 
+def test_files_without_content_tags_are_not_parsed(
+    memory_preprocessor, monkeypatch: pytest.MonkeyPatch
+):
+    """Test that files without any content or body tag are reported empty without parsing."""
+    def fail(*args, **kwargs):
+        raise AssertionError("file should have been skipped before parsing")
+
+    monkeypatch.setattr("web2llm.preprocessor.BeautifulSoup", fail)
+    preprocessor = memory_preprocessor({
+        "redirect.html": '<html><head><meta http-equiv="refresh" content="0; url=page.html"></head></html>',
+    })
+    html_files, _ = preprocessor.process_html_files()
+
+    assert len(html_files) == 1
+    assert len(preprocessor.debug_info["content_extraction"]["empty"]) == 1
+
+
 def test_preprocessor_with_missing_body(tmp_path: Path):
     """Test preprocessing of HTML without body tag."""
     test_dir = tmp_path / "test"
@@ -573,16 +907,6 @@ def test_preprocessor_with_complex_navigation(tmp_path: Path):
     assert all(f"<h{i}>" in result for i in range(2, 4))
 
 
-def test_normalize_url_edge_cases():
-    """Test edge cases for URL normalization."""
-    preprocessor = HTMLPreprocessor("test_dir")
-    assert preprocessor._normalize_url("index.html") == ""  # Removes index.html
-    assert preprocessor._normalize_url("page/") == "page"  # Removes trailing slash
-    assert preprocessor._normalize_url("page/index.html") == "page"  # Removes trailing slash first, then index.html
-    assert preprocessor._normalize_url("page.html") == "page.html"  # Not an index.html file, so no change
-    assert preprocessor._normalize_url("page/index.html/") == "page"  # Handles trailing slash and index.html
-
-
 def test_tabbed_content_edge_cases(tmp_path):
     """Test edge cases in tabbed content processing."""
     html_content = """
@@ -605,9 +929,6 @@ def test_tabbed_content_edge_cases(tmp_path):
         </div>
     </div>
     """
-    test_file = tmp_path / "test.html"
-    test_file.write_text(html_content)
-
     preprocessor = HTMLPreprocessor(str(tmp_path))
     soup = BeautifulSoup(html_content, 'html.parser')
     preprocessor._fix_resource_paths(soup, "test.html")
@@ -617,6 +938,27 @@ def test_tabbed_content_edge_cases(tmp_path):
     assert len(soup.find_all('div', {'class': 'printer-friendly-tabs'})) == 0  # No valid tabs to transform
 
 
+@pytest.mark.parametrize("html_content", [
+    '<html><head></head><body><div class="tabbed-set"><div class="tabbed-labels">'
+    '<label>A</label></div><div class="tabbed-content"><div class="tabbed-block">'
+    '<img src="a.png"></div></div></div></body></html>',
+    '<html><body><p>No tabs or resources</p></body></html>',
+    '<html><body><IMG\nSRC = "b.png"><script src="app.js"></script></body></html>',
+    '<html><body><svg><use xlink:href="icons.svg#i"/></svg></body></html>',
+], ids=["tabs_and_images", "plain", "uppercase_attributes", "xlink_href"])
+def test_fix_resource_paths_with_source_matches_full_scan(tmp_path: Path, html_content: str):
+    """Test that passing the source text skips only passes with nothing to do."""
+    preprocessor = HTMLPreprocessor(str(tmp_path))
+    test_file = str(tmp_path / "test.html")
+
+    scanned = BeautifulSoup(html_content, 'lxml')
+    preprocessor._fix_resource_paths(scanned, test_file)
+    gated = BeautifulSoup(html_content, 'lxml')
+    preprocessor._fix_resource_paths(gated, test_file, html_content)
+
+    assert str(gated) == str(scanned)
+
+
 def test_svg_external_references(tmp_path):
     """Test handling of external SVG references."""
     html_content = """
@@ -628,9 +970,6 @@ def test_svg_external_references(tmp_path):
         <use href="data:image/svg+xml;base64,abc"/>
     </svg>
     """
-    test_file = tmp_path / "test.html"
-    test_file.write_text(html_content)
-
     preprocessor = HTMLPreprocessor(str(tmp_path))
     soup = BeautifulSoup(html_content, 'html.parser')
     preprocessor._fix_resource_paths(soup, "test.html")
@@ -674,11 +1013,12 @@ def test_svg_resource_paths(tmp_path: Path):
     # The SVG is converted to an img tag with a data URL
     assert "data:image/svg+xml" in result
     # The original SVG content is encoded in the data URL
-    assert "icons%2Ficon.svg%23symbol" in result
-    assert "images%2Fimg.svg" in result
-    assert "http%3A%2F%2Fexample.com%2Ficon.svg" in result
-    assert "%23internal-ref" in result
-    assert "data%3Aimage%2Fsvg%2Bxml%3Bbase64%2Cabc" in result
+    svgs = _svg_markup(result)
+    assert "icons/icon.svg#symbol" in svgs
+    assert "images/img.svg" in svgs
+    assert "http://example.com/icon.svg" in svgs
+    assert "#internal-ref" in svgs
+    assert "data:image/svg+xml;base64,abc" in svgs
 
 
 def test_content_element_detection(tmp_path: Path):
@@ -710,6 +1050,31 @@ def test_content_element_detection(tmp_path: Path):
     assert "Main tag content" in result
 
 
+def test_content_element_priority_over_document_order(tmp_path: Path):
+    """Test that a preferred content element wins even when it appears last."""
+    test_dir = tmp_path / "test"
+    test_dir.mkdir()
+
+    html_content = """
+    <html>
+    <body>
+        <div class="content">Content div</div>
+        <div id="main-content">Main content div</div>
+        <article>Article content</article>
+    </body>
+    </html>
+    """
+    (test_dir / "test.html").write_text(html_content)
+
+    preprocessor = HTMLPreprocessor(str(test_dir))
+    _, result = preprocessor.process_html_files()
+
+    assert "Article content" in result
+    assert "Content div" not in result
+    details = preprocessor.debug_info["content_extraction_details"][0]
+    assert details["elements_found"]["article"] is True
+
+
 def test_navigation_with_empty_links(tmp_path: Path):
     """Test handling of navigation with empty or invalid links."""
     test_dir = tmp_path / "test"
@@ -816,11 +1181,12 @@ def test_svg_href_handling(tmp_path: Path):
 
     assert len(html_files) == 1
     # The SVG content is encoded in a data URL
-    assert "relative%2Fpath.svg" in result
-    assert "another%2Fpath.svg" in result
-    assert "data%3Aimage%2Fsvg%2Bxml%3Bbase64%2Cabc" in result
-    assert "%23internal" in result
-    assert "http%3A%2F%2Fexample.com%2Fexternal.svg" in result
+    svgs = _svg_markup(result)
+    assert "relative/path.svg" in svgs
+    assert "another/path.svg" in svgs
+    assert "data:image/svg+xml;base64,abc" in svgs
+    assert "#internal" in svgs
+    assert "http://example.com/external.svg" in svgs
 
 
 def test_url_normalization_with_empty_and_hash(tmp_path: Path):
@@ -1049,10 +1415,11 @@ def test_svg_href_path_conversion(tmp_path: Path):
     # Check that SVG content is encoded as a data URL
     assert "data:image/svg+xml" in result
     # Check that original paths are preserved in the encoded URL
-    assert "svg%2Ficon.svg" in result
-    assert "http%3A%2F%2Fexample.com%2Ficon.svg" in result
-    assert "data%3Aimage%2Fsvg%2Bxml%3Bbase64%2Cabc" in result
-    assert "%23internal" in result
+    svgs = _svg_markup(result)
+    assert "svg/icon.svg" in svgs
+    assert "http://example.com/icon.svg" in svgs
+    assert "data:image/svg+xml;base64,abc" in svgs
+    assert "#internal" in svgs
 
 
 def test_url_normalization_with_empty_and_hash(tmp_path: Path):
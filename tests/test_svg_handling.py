@@ -4,7 +4,8 @@ from pathlib import Path
 import pytest
 from bs4 import BeautifulSoup
 
-from web2llm.preprocessor import HTMLPreprocessor
+from _html_utils import _svg_markup
+from web2llm.preprocessor import HTMLPreprocessor, _svg_data_uri
 
 
 @pytest.fixture
@@ -33,13 +34,12 @@ def svg_html() -> str:
 
 def test_svg_to_img_conversion(tmp_path: Path, svg_html: str):
     """Test conversion of SVG elements to img tags."""
-    # Create a test file
+    # Resource paths are resolved relative to this file
     test_file = tmp_path / "test.html"
-    test_file.write_text(svg_html)
 
     # Process the file
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(svg_html, 'html.parser')
+    soup = BeautifulSoup(svg_html, 'lxml')
     preprocessor._fix_resource_paths(soup, str(test_file))
 
     # Check that SVGs were converted to images
@@ -74,10 +74,9 @@ def test_svg_style_inheritance(tmp_path: Path):
     """
 
     test_file = tmp_path / "test.html"
-    test_file.write_text(html)
 
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     preprocessor._fix_resource_paths(soup, str(test_file))
 
     img = soup.find('img')
@@ -86,6 +85,45 @@ def test_svg_style_inheritance(tmp_path: Path):
     assert "margin: 10px" in img['style']
 
 
+def test_svg_style_inheritance_with_shared_ancestors(tmp_path: Path):
+    """Test that SVGs sharing ancestors each inherit their own chain, nearest first."""
+    html = """
+    <div style="color: blue;">
+        <span style="margin: 10px;">
+            <svg width="10" height="10"><circle r="5"/></svg>
+        </span>
+        <p>
+            <svg width="20" height="20"><circle r="5"/></svg>
+        </p>
+    </div>
+    """
+
+    preprocessor = HTMLPreprocessor(str(tmp_path))
+    soup = BeautifulSoup(html, 'lxml')
+    preprocessor._fix_resource_paths(soup, str(tmp_path / "test.html"))
+
+    first, second = soup.find_all('img')
+    assert first['style'].startswith("margin: 10px; color: blue;")
+    assert second['style'].startswith("color: blue;")
+    assert "margin" not in second['style']
+
+
+def test_repeated_svg_icons_are_encoded_once(tmp_path: Path):
+    """Test that identical inline SVGs share one cached data URI."""
+    icon = '<svg width="12" height="12"><path d="M0 0h12v12"/></svg>'
+    html = f"<html><body><p>{icon}</p><p>{icon}</p></body></html>"
+
+    preprocessor = HTMLPreprocessor(str(tmp_path))
+    soup = BeautifulSoup(html, 'lxml')
+    hits = _svg_data_uri.cache_info().hits
+    preprocessor._fix_resource_paths(soup, str(tmp_path / "test.html"))
+
+    first, second = soup.find_all('img')
+    assert first['src'] == second['src']
+    assert 'd="M0 0h12v12"' in _svg_markup(first['src'])
+    assert _svg_data_uri.cache_info().hits == hits + 1
+
+
 def test_svg_attributes_handling(tmp_path: Path):
     """Test handling of various SVG attributes."""
     html = """
@@ -98,19 +136,18 @@ def test_svg_attributes_handling(tmp_path: Path):
     """
 
     test_file = tmp_path / "test.html"
-    test_file.write_text(html)
 
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     preprocessor._fix_resource_paths(soup, str(test_file))
 
     images = soup.find_all('img')
 
     # First image should have the viewBox from viewbox
-    assert "0%200%20100%20100" in images[0]['src']
+    assert 'viewBox="0 0 100 100"' in _svg_markup(images[0]['src'])
 
     # Second image should have default viewBox
-    assert "0%200%2024%2024" in images[1]['src']
+    assert 'viewBox="0 0 24 24"' in _svg_markup(images[1]['src'])
 
 
 def test_external_svg_references(tmp_path: Path):
@@ -126,10 +163,9 @@ def test_external_svg_references(tmp_path: Path):
     """
 
     test_file = tmp_path / "test.html"
-    test_file.write_text(html)
 
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     preprocessor._fix_resource_paths(soup, str(test_file))
 
     # Check that relative paths were converted to absolute
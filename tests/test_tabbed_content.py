@@ -7,8 +7,8 @@ from bs4 import BeautifulSoup
 from web2llm.preprocessor import HTMLPreprocessor
 
 
-@pytest.fixture
-def tabbed_html() -> str:
+@pytest.fixture(scope="session")
+def tabbed_html_source() -> str:
     """Create a test HTML with tabbed content."""
     return """
     <html>
@@ -48,19 +48,23 @@ def tabbed_html() -> str:
     """
 
 
-def test_tabbed_content_conversion(tmp_path: Path, tabbed_html: str):
+@pytest.fixture
+def tabbed_soup(tabbed_html_source: str) -> BeautifulSoup:
+    """Parse the tabbed content into a fresh tree, since tests mutate it."""
+    return BeautifulSoup(tabbed_html_source, 'lxml')
+
+
+def test_tabbed_content_conversion(tmp_path: Path, tabbed_soup: BeautifulSoup):
     """Test conversion of tabbed content to printer-friendly format."""
-    # Create a test file
+    # Resource paths are resolved relative to this file
     test_file = tmp_path / "test.html"
-    test_file.write_text(tabbed_html)
 
     # Process the file
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(tabbed_html, 'html.parser')
-    preprocessor._fix_resource_paths(soup, str(test_file))
+    preprocessor._fix_resource_paths(tabbed_soup, str(test_file))
 
     # Check that tabbed sets were converted
-    printer_tabs = soup.find_all('div', {'class': 'printer-friendly-tabs'})
+    printer_tabs = tabbed_soup.find_all('div', {'class': 'printer-friendly-tabs'})
     assert len(printer_tabs) == 2
 
     # Check first tabbed set (code examples)
@@ -83,7 +87,7 @@ def test_tabbed_content_conversion(tmp_path: Path, tabbed_html: str):
     assert len(sections) == 2
 
     # Check that styles were added
-    style_tag = soup.head.find('style')
+    style_tag = tabbed_soup.head.find('style')
     assert style_tag is not None
     assert '.printer-friendly-tabs' in style_tag.string
 
@@ -91,25 +95,28 @@ def test_tabbed_content_conversion(tmp_path: Path, tabbed_html: str):
 def test_incomplete_tabbed_content(tmp_path: Path):
     """Test handling of incomplete or malformed tabbed content."""
     html = """
-    <div class="tabbed-set">
-        <div class="tabbed-labels">
-            <label>Tab 1</label>
+    <html>
+    <body>
+        <div class="tabbed-set">
+            <div class="tabbed-labels">
+                <label>Tab 1</label>
+            </div>
+            <!-- Missing tabbed-content div -->
         </div>
-        <!-- Missing tabbed-content div -->
-    </div>
-    <div class="tabbed-set">
-        <!-- Missing labels -->
-        <div class="tabbed-content">
-            <div class="tabbed-block">Content</div>
+        <div class="tabbed-set">
+            <!-- Missing labels -->
+            <div class="tabbed-content">
+                <div class="tabbed-block">Content</div>
+            </div>
         </div>
-    </div>
+    </body>
+    </html>
     """
 
     test_file = tmp_path / "test.html"
-    test_file.write_text(html)
 
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     preprocessor._fix_resource_paths(soup, str(test_file))
 
     # Check that malformed tabbed sets were not converted
@@ -149,10 +156,9 @@ def test_nested_tabbed_content(tmp_path: Path):
     """
 
     test_file = tmp_path / "test.html"
-    test_file.write_text(html)
 
     preprocessor = HTMLPreprocessor(str(tmp_path))
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, 'lxml')
     preprocessor._fix_resource_paths(soup, str(test_file))
 
     # Check that the outer tab was converted
@@ -162,4 +168,36 @@ def test_nested_tabbed_content(tmp_path: Path):
     # Check that the inner tab content is present
     outer_tab = printer_tabs[0]
     assert 'Inner Content' in outer_tab.get_text()
-    assert 'Inner Tab' in outer_tab.get_text()
\ No newline at end of file
+    assert 'Inner Tab' in outer_tab.get_text()
+
+
+def test_tab_block_containing_another_tabs_block(tmp_path: Path):
+    """Test that a block selected for one tab keeps a nested block used by the next."""
+    html = """
+    <html>
+    <head></head>
+    <body>
+        <div class="tabbed-set">
+            <div class="tabbed-labels">
+                <label>Outer</label>
+                <label>Nested</label>
+            </div>
+            <div class="tabbed-content">
+                <div class="tabbed-block">
+                    <p>Outer Content</p>
+                    <div class="tabbed-block">Nested Content</div>
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+    preprocessor = HTMLPreprocessor(str(tmp_path))
+    soup = BeautifulSoup(html, 'lxml')
+    preprocessor._fix_resource_paths(soup, str(tmp_path / "test.html"))
+
+    contents = soup.find_all('div', {'class': 'tab-content'})
+    assert len(contents) == 2
+    assert 'Nested Content' in contents[0].get_text()
+    assert 'Nested Content' in contents[1].get_text()
@@ -5,10 +5,12 @@ into standardized PDF formats, making post-cutoff documentation accessible to la
 """
 
 import argparse
+import functools
 import os
 import shutil
 import sys
 from pathlib import Path
+from typing import List, Optional
 from urllib.parse import urlparse
 
 from .converter import convert_to_pdf
@@ -16,13 +18,25 @@ from .downloader import WebsiteDownloader
 from .preprocessor import HTMLPreprocessor
 
 
-def get_website_name(url: str) -> str:
-    """Get a safe directory name from the URL."""
-    parsed = urlparse(url)
-    return parsed.netloc.replace(":", "_").replace("/", "_")
+# Characters of a netloc that are unsafe in a directory name
+_NETLOC_TRANS = str.maketrans({":": "_", "/": "_"})
 
 
-def main(url: str, output: str, debug: bool = False, quiet: bool = False, skip_download: bool = False, download_only: bool = False) -> None:
+@functools.lru_cache(maxsize=128)
+def get_website_name(url: str) -> str:
+    """Get a safe directory name from the URL."""
+    return urlparse(url).netloc.translate(_NETLOC_TRANS)
+
+
+def main(
+    url: str,
+    output: str,
+    debug: bool = False,
+    quiet: bool = False,
+    skip_download: bool = False,
+    download_only: bool = False,
+    cache_dir: Optional[str] = None,
+) -> None:
     """Prepare online documentation for LLM consumption.
 
     Downloads a website and converts it into a standardized PDF format suitable for
@@ -36,6 +50,7 @@ def main(url: str, output: str, debug: bool = False, quiet: bool = False, skip_d
         quiet: Whether to suppress progress output
         skip_download: Whether to skip downloading and use existing files
         download_only: Whether to only download the website and skip preprocessing/conversion
+        cache_dir: Directory for caching extracted sections across runs, if any
     """
     # Get website name for directory structure
     website_name = get_website_name(url)
@@ -75,7 +90,9 @@ def main(url: str, output: str, debug: bool = False, quiet: bool = False, skip_d
         if debug_dir:
             debug_dir.mkdir(parents=True, exist_ok=True)
 
-        preprocessor = HTMLPreprocessor(str(downloaded_dir), str(debug_dir) if debug_dir else None)
+        preprocessor = HTMLPreprocessor(
+            str(downloaded_dir), str(debug_dir) if debug_dir else None, cache_dir=cache_dir
+        )
         html_files, master_html = preprocessor.process_html_files()
 
         # Convert to PDF
@@ -95,8 +112,8 @@ def main(url: str, output: str, debug: bool = False, quiet: bool = False, skip_d
             shutil.rmtree(downloads_dir)
 
 
-def parse_args() -> argparse.Namespace:
-    """Parse command line arguments."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
     parser = argparse.ArgumentParser(
         description='Convert online documentation into LLM-friendly PDF format'
     )
@@ -106,9 +123,16 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--quiet', '-q', action='store_true', help='Suppress progress output')
     parser.add_argument('--skip-download', action='store_true', help='Skip downloading and use existing files')
     parser.add_argument('--download-only', action='store_true', help='Only download the website, skip preprocessing and conversion')
-    return parser.parse_args()
+    parser.add_argument('--cache-dir', help='Reuse sections of unchanged pages cached in this directory')
+    return parser
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    return _build_parser().parse_args(argv)
 
 
 if __name__ == '__main__':
     args = parse_args()
-    main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only)
\ No newline at end of file
+    main(args.url, args.output, args.debug, args.quiet, args.skip_download, args.download_only,
+         args.cache_dir)
\ No newline at end of file
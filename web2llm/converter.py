@@ -1,8 +1,60 @@
 """Module for converting HTML content to PDF using wkhtmltopdf."""
 
+import functools
 import os
 import re
-from pathlib import Path
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Default wkhtmltopdf options, shared read-only by every PDFConverter
+_DEFAULT_OPTIONS = MappingProxyType({
+    'page-size': 'A4',
+    'margin-top': '20mm',
+    'margin-right': '20mm',
+    'margin-bottom': '20mm',
+    'margin-left': '20mm',
+    'encoding': 'UTF-8',
+    'enable-local-file-access': None,
+    # The merged document has its scripts stripped, so there is nothing to wait for
+    'javascript-delay': 0,
+    'no-stop-slow-scripts': None,
+    'enable-javascript': None,
+    'load-error-handling': 'ignore',
+    'load-media-error-handling': 'ignore',
+    'quiet': None,
+    'print-media-type': None,
+    'orientation': 'Portrait',
+    'title': 'Documentation',
+    'enable-external-links': None,
+    'enable-internal-links': None,
+    'outline': None,
+    'outline-depth': 3,
+    'grayscale': None,
+    'log-level': 'info',
+    'disable-smart-shrinking': None,
+    'image-quality': 100,
+    'zoom': 1.0,
+})
+
+# Meta tag declaring the document encoding for wkhtmltopdf's SVG handling
+_CONTENT_TYPE_META = '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />'
+
+# Resource-bearing attributes rewritten by _fix_relative_paths
+_ATTR_RE = re.compile(r'\b(href|src|data)="([^"]+)"')
+
+# URL prefixes that are already absolute and must be left untouched
+_ABSOLUTE_PREFIXES = ('http://', 'https://', 'file://', 'data:', '#')
+
+
+@functools.lru_cache(maxsize=1)
+def _wkhtmltopdf_config():
+    """Locate wkhtmltopdf once and return the pdfkit configuration for it."""
+    import pdfkit
+
+    path = shutil.which('wkhtmltopdf') or '/usr/local/bin/wkhtmltopdf'
+    return pdfkit.configuration(wkhtmltopdf=path)
 
 
 class PDFConverter:
@@ -10,44 +62,22 @@ class PDFConverter:
 
     def __init__(self):
         """Initialize the PDF converter with default options."""
-        self.default_options = {
-            'page-size': 'A4',
-            'margin-top': '20mm',
-            'margin-right': '20mm',
-            'margin-bottom': '20mm',
-            'margin-left': '20mm',
-            'encoding': 'UTF-8',
-            'enable-local-file-access': None,
-            'javascript-delay': 2000,
-            'no-stop-slow-scripts': None,
-            'enable-javascript': None,
-            'load-error-handling': 'ignore',
-            'load-media-error-handling': 'ignore',
-            'quiet': None,
-            'print-media-type': None,
-            'orientation': 'Portrait',
-            'title': 'Documentation',
-            'enable-external-links': None,
-            'enable-internal-links': None,
-            'outline': None,
-            'outline-depth': 3,
-            'grayscale': None,
-            'log-level': 'info',
-            'disable-smart-shrinking': None,
-            'image-quality': 100,
-            'zoom': 1.0,
-            'print-media-type': None,
-            'javascript-delay': 1000
-        }
-
-
-def convert_to_pdf(html_content: str, output_path: str, use_advanced_options: bool = True) -> None:
+        self.default_options = _DEFAULT_OPTIONS
+
+
+def convert_to_pdf(
+    html_content: str,
+    output_path: str,
+    use_advanced_options: bool = True,
+    options: Optional[Dict[str, Any]] = None,
+) -> None:
     """Convert HTML content to PDF.
 
     Args:
         html_content: HTML content to convert
         output_path: Path where to save the PDF file
         use_advanced_options: Whether to use advanced PDF options (default: True)
+        options: wkhtmltopdf options overriding the defaults
     """
     import pdfkit  # Import here to avoid loading if not needed
 
@@ -55,63 +85,112 @@ def convert_to_pdf(html_content: str, output_path: str, use_advanced_options: bo
     output_dir = os.path.dirname(os.path.abspath(output_path))
     os.makedirs(output_dir, exist_ok=True)
 
-    converter = PDFConverter()
-    options = converter.default_options
+    options = {**_DEFAULT_OPTIONS, **(options or {})}
 
     try:
-        # Create temporary file for processing
-        temp_dir = Path(output_dir) / ".temp"
-        temp_dir.mkdir(exist_ok=True)
-        temp_html = temp_dir / "temp.html"
-        temp_html.write_text(html_content, encoding="utf-8")
-
-        try:
-            # Use explicit wkhtmltopdf path and configuration
-            config = pdfkit.configuration(wkhtmltopdf='/usr/local/bin/wkhtmltopdf')
-            pdfkit.from_file(
-                str(temp_html),
-                output_path,
-                options=options,
-                configuration=config,
-                verbose=True
-            )
-        finally:
-            temp_html.unlink(missing_ok=True)
-            temp_dir.rmdir()
+        # Reuse the wkhtmltopdf configuration located by the first conversion
+        config = _wkhtmltopdf_config()
+        # Pipe the document to wkhtmltopdf's stdin instead of a temporary file;
+        # local resources are referenced by absolute file:// URLs
+        pdfkit.from_string(
+            html_content,
+            output_path,
+            options=options,
+            configuration=config,
+            verbose=True
+        )
 
     except Exception as e:
         raise RuntimeError(f"PDF conversion failed: {str(e)}")
 
 
+def convert_many(
+    pairs: Iterable[Tuple[str, str]],
+    workers: Optional[int] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Convert several HTML documents to PDF concurrently.
+
+    Each document is rendered by its own wkhtmltopdf process, so plain threads
+    are enough to keep the processes running side by side while the HTML stays
+    in this process instead of being pickled to workers.
+
+    Args:
+        pairs: (html_content, output_path) tuples to convert
+        workers: Maximum number of concurrent conversions (default: CPU count)
+        options: wkhtmltopdf options overriding the defaults
+
+    Raises:
+        RuntimeError: If any conversion fails, after all others have finished
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(pairs))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(convert_to_pdf, html_content, output_path, options=options)
+            for html_content, output_path in pairs
+        ]
+    for future in futures:
+        future.result()
+
+
 def _fix_relative_paths(html_content: str, base_dir: str) -> str:
     """Fix relative paths in HTML content."""
-    # Convert base_dir to file:// URL format
-    base_url = f"file://{os.path.abspath(base_dir)}"
+    # Resolve base_dir once; joined paths only need normalizing afterwards
+    base_abs = os.path.abspath(base_dir)
+    base_url = f"file://{base_abs}"
+    # Prefix for joining by concatenation; posix paths only, normpath handles the rest
+    base_prefix = base_abs.rstrip('/') + '/' if os.sep == '/' else None
+
+    # Nothing to rewrite, only the head tags need checking
+    if 'href="' not in html_content and 'src="' not in html_content and 'data="' not in html_content:
+        return _ensure_head_tags(html_content, base_url)
 
     # Add SVG MIME type support
     def fix_path(match):
         attr, path = match.groups()
-        if path.startswith(('http://', 'https://', 'file://', 'data:', '#')):
+        if path.startswith(_ABSOLUTE_PREFIXES):
             return f'{attr}="{path}"'
 
+        # Without dot segments, empty segments or a leading slash, normpath would be a no-op
+        if (base_prefix and path[0] != '/' and path[-1] != '/'
+                and '//' not in path and '/.' not in f'/{path}'):
+            abs_path = base_prefix + path
+        else:
+            abs_path = os.path.normpath(os.path.join(base_abs, path))
+
         # Add proper MIME type for SVGs
         if path.endswith('.svg'):
-            abs_path = os.path.abspath(os.path.join(base_dir, path))
             return f'{attr}="file://{abs_path}#svgView(preserveAspectRatio(none))"'
 
-        return f'{attr}="file://{os.path.abspath(os.path.join(base_dir, path))}"'
+        return f'{attr}="file://{abs_path}"'
 
-    # Fix paths in src and href attributes
-    html_content = re.sub(r'(src|href)="([^"]+)"', fix_path, html_content)
+    # Fix paths in src, href and data attributes
+    html_content = _ATTR_RE.sub(fix_path, html_content)
 
-    # Add SVG-specific meta tag
-    if '<head>' in html_content and '<meta http-equiv="Content-Type"' not in html_content:
-        svg_meta = '<meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />'
-        html_content = html_content.replace('<head>', f'<head>{svg_meta}')
+    return _ensure_head_tags(html_content, base_url)
 
-    # Add base tag to head if not present
-    if '<base' not in html_content and '<head>' in html_content:
-        base_tag = f'<base href="{base_url}/">'
-        html_content = html_content.replace('<head>', f'<head>{base_tag}')
 
-    return html_content
\ No newline at end of file
+def _ensure_head_tags(html_content: str, base_url: str) -> str:
+    """Insert the base and content type tags after <head> if the head lacks them."""
+    idx = html_content.find('<head>')
+    if idx < 0:
+        return html_content
+
+    # Only look inside the head section for existing tags
+    start = idx + len('<head>')
+    end = html_content.find('</head>', start)
+    head = html_content[start:end] if end >= 0 else html_content[start:]
+
+    injection = ''
+    if '<base' not in head:
+        injection += f'<base href="{base_url}/">'
+    # Add SVG-specific meta tag
+    if '<meta http-equiv="Content-Type"' not in head:
+        injection += _CONTENT_TYPE_META
+
+    if not injection:
+        return html_content
+    return html_content[:start] + injection + html_content[start:]
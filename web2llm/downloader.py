@@ -6,17 +6,27 @@ from pathlib import Path
 from typing import List, Optional
 from urllib.parse import urlparse
 
+from .files import scan_html_files
+
+# Progress lines written between explicit stdout flushes; status lines flush at once
+_FLUSH_EVERY = 64
+
 
 class WebsiteDownloader:
     """Downloads a website using HTTrack with real-time progress display."""
 
-    def __init__(self, quiet: bool = False):
+    def __init__(self, quiet: bool = False, connections: int = 8, timeout: int = 30):
         """Initialize the downloader.
 
         Args:
             quiet: If True, suppress progress output
+            connections: Number of simultaneous HTTrack connections (HTTrack's default is 8)
+            timeout: Seconds before HTTrack gives up on a single request
         """
         self.quiet = quiet
+        self.connections = connections
+        self.timeout = timeout
+        self._unflushed_lines = 0
 
     def _print_progress(self, line: str) -> None:
         """Print progress information.
@@ -29,24 +39,31 @@ class WebsiteDownloader:
 
         # Filter and format HTTrack output for better readability
         line = line.strip()
+        status = False
         if line:
+            lowered = line.lower()
             if line.startswith(("Warning:", "Error:", "Info:")):
                 # Status messages
-                print(f"\033[1m{line}\033[0m")  # Bold
-            elif "saved" in line.lower() or "file:" in line.lower():
+                color = "\033[1m"  # Bold
+                status = True
+            elif "saved" in lowered or "file:" in lowered:
                 # File progress
-                print(f"\033[92m{line}\033[0m")  # Green
-            elif "loading" in line.lower():
+                color = "\033[92m"  # Green
+            elif "loading" in lowered:
                 # Loading status
-                print(f"\033[94m{line}\033[0m")  # Blue
-            elif any(word in line.lower() for word in ["error", "warning", "failed"]):
+                color = "\033[94m"  # Blue
+            elif "error" in lowered or "warning" in lowered or "failed" in lowered:
                 # Errors and warnings
-                print(f"\033[91m{line}\033[0m")  # Red
+                color = "\033[91m"  # Red
             else:
-                print(line)
+                color = None
+            sys.stdout.write(f"{color}{line}\033[0m\n" if color else f"{line}\n")
 
-        # Ensure output is displayed immediately
-        sys.stdout.flush()
+        # Flush in batches; a terminal is line-buffered and shows each line anyway
+        self._unflushed_lines += 1
+        if status or self._unflushed_lines >= _FLUSH_EVERY:
+            sys.stdout.flush()
+            self._unflushed_lines = 0
 
     def download(self, url: str, output_dir: Path) -> Path:
         """Download a website using HTTrack with real-time progress display.
@@ -70,35 +87,51 @@ class WebsiteDownloader:
             url,
             "-O", str(output_dir),
             "-r2",
-            "-c8",
+            f"-c{self.connections}",
+            f"-T{self.timeout}",
             "-F", "Mozilla/5.0",
             "-s0",
             "-N1",
-            "-%v",
-            "-v"
         ]
+        # Refresh an earlier mirror instead of fetching everything again
+        if (output_dir / "web").is_dir():
+            cmd.append("--update")
+        # Verbose logging roughly doubles the output; skip it when nothing is shown
+        if not self.quiet:
+            cmd.extend(["-%v", "-v"])
 
         if not self.quiet:
             print(f"\n📥 Starting download of {url}")
             print("=" * 80)
 
-        # Run HTTrack with real-time output processing
+        # Run HTTrack with real-time output processing; output is read as bytes
+        # so quiet runs never pay for decoding lines they discard
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            bufsize=65536,
         )
 
         # Process output in real-time
         try:
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                self._print_progress(line)
+            # read1 returns whatever has arrived, so a progress redraw ended by a
+            # bare carriage return is shown at once instead of at the next newline
+            pending = b""
+            for chunk in iter(lambda: process.stdout.read1(65536), b""):
+                if self.quiet:
+                    continue
+                lines = (pending + chunk).replace(b"\r", b"\n").split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    # A \r\n pair leaves an empty line behind; skip it
+                    if line:
+                        self._print_progress(line.decode("utf-8", "replace"))
+            if pending and not self.quiet:
+                self._print_progress(pending.decode("utf-8", "replace"))
+            process.wait()
+            if not self.quiet:
+                sys.stdout.flush()
 
             # Check if HTTrack completed successfully
             if process.returncode != 0:
@@ -128,9 +161,9 @@ class WebsiteDownloader:
         Returns:
             List of HTML file paths
         """
-        html_files = list(website_dir.rglob("*.html"))
+        html_files = [Path(path) for path in scan_html_files(str(website_dir))]
 
         if not self.quiet:
             print(f"\n📄 Found {len(html_files)} HTML files")
 
-        return html_files
\ No newline at end of file
+        return html_files
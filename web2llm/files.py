@@ -0,0 +1,53 @@
+"""Module for finding the HTML files of a downloaded website.
+
+The downloader and the preprocessor both walk the mirror with this one helper,
+so they always agree on which files belong to a site.
+"""
+
+import os
+from typing import Callable, Iterator, Optional
+
+
+def scan_html_files(
+    directory: str, trace: Optional[Callable[[str], None]] = None
+) -> Iterator[str]:
+    """Yield the paths of HTML files below a directory in os.walk order.
+
+    Uses the entry types cached by os.scandir instead of building and stat-ing a
+    Path per entry. Symlinked directories are not followed.
+
+    Args:
+        directory: Directory to search in
+        trace: Called with a message for every file entry considered, if given
+
+    Yields:
+        Paths of the HTML files found
+    """
+    subdirs = []
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+                continue
+
+            if trace:
+                trace(f"Found file: {entry.path}")
+            # Check the name first; only HTML candidates need their type resolved
+            if not entry.name.endswith('.html'):
+                if trace:
+                    trace(f"Skipping non-HTML file: {entry.path}")
+            elif entry.is_file():
+                if trace:
+                    trace(f"Adding HTML file: {entry.path}")
+                yield entry.path
+            elif trace:
+                trace(f"Skipping non-file: {entry.path}")
+
+    for subdir in subdirs:
+        yield from scan_html_files(subdir, trace)
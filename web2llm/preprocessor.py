@@ -1,15 +1,197 @@
 """Module for preprocessing and consolidating HTML files."""
 
 import base64
+import copy
+import functools
+import hashlib
+import html
 import json
 import os
+import pickle
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
-from urllib.parse import quote, urljoin, urlparse
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
 
+import lxml.html
 from bs4 import BeautifulSoup, Comment, Tag
+from lxml import etree
+
+from .files import scan_html_files
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib encoder is used without it
+    orjson = None
+
+# URL prefixes that already point at an absolute or embedded resource
+_ABSOLUTE_PREFIXES = ('http://', 'https://', 'data:', 'file://')
+_SVG_REF_PREFIXES = _ABSOLUTE_PREFIXES + ('#',)
+
+# Opening <details> tags that do not already carry an open attribute. Attributes are
+# skipped whole, so "open" inside another attribute's quoted value does not count.
+_DETAILS_CLOSED_RE = re.compile(
+    r'<details(?=[\s/>])'
+    r'(?!(?:\s+(?!open[\s=/>])[^\s=/>]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]+))?)*'
+    r'\s+open[\s=/>])',
+    re.IGNORECASE,
+)
+
+# Attributes an inline SVG needs to render as a standalone image, with their defaults
+_SVG_DEFAULT_ATTRS = (
+    ('xmlns', 'http://www.w3.org/2000/svg'),
+    ('width', '24'),
+    ('height', '24'),
+    ('viewBox', '0 0 24 24'),
+)
+
+# Styles injected into the document head when tabbed sets are flattened
+_TAB_STYLES = '''
+    .printer-friendly-tabs {
+        margin: 2em 0;
+        padding: 1.5em;
+        border: 1px solid #ddd;
+        border-radius: 6px;
+        background: #fff;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.1);
+    }
+    .printer-friendly-tabs .tab-section {
+        margin-bottom: 2em;
+        border-bottom: 2px solid #eee;
+        padding-bottom: 2em;
+    }
+    .printer-friendly-tabs .tab-section:last-child {
+        border-bottom: none;
+        margin-bottom: 0;
+        padding-bottom: 0;
+    }
+    .printer-friendly-tabs .tab-header {
+        font-weight: bold;
+        margin-bottom: 1em;
+        padding: 0.75em 1em;
+        background: #f5f5f5;
+        border-radius: 4px;
+        border-left: 4px solid #2196f3;
+        color: #333;
+    }
+    .printer-friendly-tabs .tab-content {
+        margin: 0 1em;
+        padding: 1em;
+        background: #fafafa;
+        border-radius: 4px;
+    }
+    .printer-friendly-tabs pre {
+        margin: 1em 0;
+        padding: 1.5em;
+        background: #f8f8f8;
+        border-radius: 4px;
+        border: 1px solid #eee;
+        overflow-x: auto;
+    }
+    .printer-friendly-tabs code {
+        font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, Courier, monospace;
+        font-size: 0.9em;
+    }
+    .printer-friendly-tabs .highlight {
+        margin: 0;
+        padding: 0;
+    }
+'''
+
+# Comments left in raw text of serialized SVGs
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+
+# A <body> start tag in the source document
+_BODY_TAG_RE = re.compile(r'<body[\s>/]', re.IGNORECASE)
+# Any start tag that could yield a content element; files without one extract nothing
+_CONTENT_TAG_RE = re.compile(r'<(?:main|article|div|body)[\s>/]', re.IGNORECASE)
+# Attributes that may reference a local resource; files without one have no paths to fix
+_RESOURCE_ATTR_RE = re.compile(r'\s(?:src|href|xlink:href)\s*=', re.IGNORECASE)
+
+_UTF8_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+# Material for MkDocs navigation blocks and the links inside them
+_NAV_XPATH = etree.XPath("//nav[contains(concat(' ', normalize-space(@class), ' '), ' md-nav ')]")
+_NAV_LINK_XPATH = etree.XPath(
+    ".//a[contains(concat(' ', normalize-space(@class), ' '), ' md-nav__link ')]"
+)
+# Link text as BeautifulSoup's get_text() sees it, without script, style or template code
+_NAV_TEXT_XPATH = etree.XPath(
+    './/text()[not(ancestor::script or ancestor::style or ancestor::template)]'
+)
+
+# Wrapper for each extracted file in the master document; attribute order matches
+# what BeautifulSoup would serialize
+_SECTION_TEMPLATE = '<section class="document-section"{nav} data-source="{source}">{body}</section>'
+
+# Cross-run cache of extracted sections; bump the version when extraction output changes
+_CONTENT_CACHE_FILE = 'content_cache.json'
+_CONTENT_CACHE_VERSION = 3
+
+# Sites with fewer files than this are processed inline to avoid pool startup costs
+_PROCESS_POOL_THRESHOLD = 32
+
+
+def _escape_attr(value: str) -> str:
+    """Escape a value for use inside a double-quoted HTML attribute."""
+    return html.escape(value, quote=False).replace('"', '&quot;')
+
+
+def _write_bytes(path: str, chunks: Iterable[bytes]) -> None:
+    """Write already-encoded chunks to a file through a single descriptor."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for chunk in chunks:
+            view = memoryview(chunk)
+            while view:
+                view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=1024)
+def _svg_data_uri(svg_markup: str) -> str:
+    """Clean up serialized SVG markup and encode it as a data URI."""
+    # Comment nodes are gone; only raw style or script text can still hold one
+    if '<!--' in svg_markup:
+        svg_markup = _COMMENT_RE.sub('', svg_markup)
+    # Collapse whitespace runs and trim the ends in one C-level pass
+    svg_markup = ' '.join(svg_markup.split())
+
+    # Base64 is shorter than percent-encoding for markup and much cheaper to compute
+    svg_b64 = base64.b64encode(svg_markup.encode('utf-8')).decode('ascii')
+    return f"data:image/svg+xml;charset=utf-8;base64,{svg_b64}"
+
+
+def _dump_debug_json(data: Dict[str, Any]) -> bytes:
+    """Serialize debug information as indented UTF-8 JSON."""
+    # json's C encoder is bypassed whenever indent is set; orjson indents natively
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _ancestor_styles(
+    node: Optional[Tag], cache: Dict[int, Tuple[Tag, Tuple[str, ...]]]
+) -> Tuple[str, ...]:
+    """Return the style attributes of a node and its ancestors, nearest first.
+
+    Results are memoized per node in cache, so tags sharing ancestors walk each
+    chain only once. Entries hold their node, keeping its id from being reused.
+    """
+    chain = []
+    while node is not None and id(node) not in cache:
+        chain.append(node)
+        node = node.parent
+    styles = cache[id(node)][1] if node is not None else ()
+    for tag in reversed(chain):
+        style = tag.get('style')
+        if style:
+            styles = (style, *styles)
+        cache[id(tag)] = (tag, styles)
+    return styles
 
 
 @dataclass
@@ -21,10 +203,43 @@ class NavigationItem:
 class HTMLPreprocessor:
     """Preprocesses HTML files for PDF conversion."""
 
-    def __init__(self, base_dir: str, debug_dir: Optional[str] = None):
-        """Initialize the preprocessor."""
+    # Main content candidates in order of preference: (elements_found key, tag, attrs)
+    _CONTENT_SELECTORS = (
+        ("main", 'main', {}),
+        ("article", 'article', {}),
+        ("main_div", 'div', {'id': 'main-content'}),
+        ("content_div", 'div', {'class': 'content'}),
+    )
+    # Elements removed from the extracted content
+    _STRIPPED_TAGS = ('script', 'style', 'nav')
+    # Resource-referencing tags rewritten to absolute file URLs, with their attribute
+    _RESOURCE_ATTRS = {'use': 'href', 'image': 'href', 'link': 'href', 'script': 'src'}
+
+    def __init__(
+        self,
+        base_dir: str,
+        debug_dir: Optional[str] = None,
+        parser: str = 'lxml',
+        cache_dir: Optional[str] = None,
+    ):
+        """Initialize the preprocessor.
+
+        Args:
+            base_dir: Directory containing the downloaded website
+            debug_dir: Optional directory for debug output
+            parser: BeautifulSoup tree builder used for whole documents
+            cache_dir: Optional directory for caching extracted sections across runs
+        """
         self.base_dir = base_dir
         self.debug_dir = debug_dir
+        self.parser = parser
+        self.cache_dir = cache_dir
+        self._content_cache = self._load_content_cache()
+        # Entries hit or produced by the current run; only these are saved back
+        self._live_cache: Dict[str, Dict[str, Any]] = {}
+        # Worker pool shared by all extraction batches of a run, started on first use
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_failed = False
         self.debug_info = {
             "file_processing": {
                 "found_files": [],
@@ -50,28 +265,39 @@ class HTMLPreprocessor:
         }
         self.seen_urls = set()
         self.url_to_file_map = {}  # Map navigation URLs to actual file paths
+        self._known_files: Dict[str, str] = {}  # Relative path suffixes to the first file ending in them
         self.processed_files = set()
 
-    def _normalize_url(self, url: str) -> str:
-        """Normalize a URL by removing trailing slashes and index.html."""
-        url = url.rstrip('/')
-        if url.endswith('index.html'):
-            url = url[:-10].rstrip('/')
-        return url
+    def _fix_resource_paths(
+        self, soup: BeautifulSoup, file_path: str, html_text: Optional[str] = None
+    ) -> None:
+        """Fix paths to local resources.
 
-    def _fix_resource_paths(self, soup: BeautifulSoup, file_path: str) -> None:
-        """Fix paths to local resources."""
+        Args:
+            soup: Parsed document, modified in place
+            file_path: Path of the file the document was read from
+            html_text: Source the document was parsed from, if available; lets
+                passes with nothing to do in it skip their tree walk
+        """
         base_dir = os.path.dirname(os.path.abspath(file_path))
         base_url = f"file://{base_dir}/"
-
-        # Expand all details elements
-        for details in soup.find_all('details'):
-            details['open'] = 'open'  # Add open attribute to show content by default
+        has_tabs = html_text is None or 'tabbed-' in html_text
+        has_links = html_text is None or _RESOURCE_ATTR_RE.search(html_text) is not None
 
         # Handle tabbed code blocks
-        for tabbed_set in soup.find_all('div', {'class': ['tabbed-set', 'tabbed-alternate']}):
-            # Create a new div to hold the transformed content
-            new_div = soup.new_tag('div', attrs={'class': 'printer-friendly-tabs'})
+        has_tab_styles = None
+        converted = set()
+        tabbed_sets = (
+            soup.find_all('div', {'class': ['tabbed-set', 'tabbed-alternate']}) if has_tabs else ()
+        )
+        for tabbed_set in tabbed_sets:
+            # A set nested in an already converted one moved along with its block and
+            # is kept as is; one left behind in a replaced set is detached and discarded
+            ancestors = list(tabbed_set.parents)
+            if not ancestors or ancestors[-1] is not soup:
+                continue
+            if any(id(parent) in converted for parent in ancestors):
+                continue
 
             # Find all tab labels
             labels_div = tabbed_set.find('div', {'class': 'tabbed-labels'})
@@ -92,6 +318,20 @@ class HTMLPreprocessor:
             if not tab_blocks:
                 continue
 
+            # Blocks are found recursively, so one tab's block may hold another's;
+            # those are copied, every other block is moved out of the discarded set
+            selected = {id(block) for block in tab_blocks[:len(labels)]}
+            shared = set()
+            for block in tab_blocks[:len(labels)]:
+                for parent in block.parents:
+                    if parent is tabbed_content:
+                        break
+                    if id(parent) in selected:
+                        shared.add(id(parent))
+
+            # Create a new div to hold the transformed content, now that the set is valid
+            new_div = soup.new_tag('div', attrs={'class': 'printer-friendly-tabs'})
+
             # Process each tab
             for label, content in zip(labels, tab_blocks):
                 # Create a header for the tab
@@ -105,92 +345,51 @@ class HTMLPreprocessor:
                 # Create a new content div
                 content_div = soup.new_tag('div', attrs={'class': 'tab-content'})
 
-                # Extract and preserve the content
-                content_html = str(content)
-                content_div.append(BeautifulSoup(content_html, 'html.parser'))
+                content_div.append(copy.copy(content) if id(content) in shared else content)
 
                 tab_wrapper.append(content_div)
                 new_div.append(tab_wrapper)
 
             # Replace the original tabbed set with our printer-friendly version
             tabbed_set.replace_with(new_div)
+            converted.add(id(new_div))
 
             # Add styles for printer-friendly tabs to the head section
-            style = soup.new_tag('style')
-            style.string = '''
-                .printer-friendly-tabs {
-                    margin: 2em 0;
-                    padding: 1.5em;
-                    border: 1px solid #ddd;
-                    border-radius: 6px;
-                    background: #fff;
-                    box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-                }
-                .printer-friendly-tabs .tab-section {
-                    margin-bottom: 2em;
-                    border-bottom: 2px solid #eee;
-                    padding-bottom: 2em;
-                }
-                .printer-friendly-tabs .tab-section:last-child {
-                    border-bottom: none;
-                    margin-bottom: 0;
-                    padding-bottom: 0;
-                }
-                .printer-friendly-tabs .tab-header {
-                    font-weight: bold;
-                    margin-bottom: 1em;
-                    padding: 0.75em 1em;
-                    background: #f5f5f5;
-                    border-radius: 4px;
-                    border-left: 4px solid #2196f3;
-                    color: #333;
-                }
-                .printer-friendly-tabs .tab-content {
-                    margin: 0 1em;
-                    padding: 1em;
-                    background: #fafafa;
-                    border-radius: 4px;
-                }
-                .printer-friendly-tabs pre {
-                    margin: 1em 0;
-                    padding: 1.5em;
-                    background: #f8f8f8;
-                    border-radius: 4px;
-                    border: 1px solid #eee;
-                    overflow-x: auto;
-                }
-                .printer-friendly-tabs code {
-                    font-family: "SFMono-Regular", Consolas, "Liberation Mono", Menlo, Courier, monospace;
-                    font-size: 0.9em;
-                }
-                .printer-friendly-tabs .highlight {
-                    margin: 0;
-                    padding: 0;
-                }
-            '''
-            if not soup.head.find('style', string=lambda x: x and '.printer-friendly-tabs' in x):
+            if has_tab_styles is None:
+                has_tab_styles = soup.head.find(
+                    'style', string=lambda x: x and '.printer-friendly-tabs' in x
+                ) is not None
+            if not has_tab_styles:
+                style = soup.new_tag('style')
+                style.string = _TAB_STYLES
                 soup.head.append(style)
+                has_tab_styles = True
+
+        # Collect the tags the remaining passes need in a single walk over the tree
+        imgs, svgs, resources = [], [], []
+        buckets = {'svg': svgs}
+        if has_links:
+            buckets['img'] = imgs
+            buckets.update(dict.fromkeys(self._RESOURCE_ATTRS, resources))
+        for element in soup.descendants:
+            bucket = buckets.get(element.name)
+            if bucket is not None:
+                bucket.append(element)
 
         # Fix image sources
-        for img in soup.find_all('img'):
+        for img in imgs:
             src = img.get('src')
-            if src and not src.startswith(('http://', 'https://', 'data:', 'file://')):
+            if src and not src.startswith(_ABSOLUTE_PREFIXES):
                 img['src'] = urljoin(base_url, src)
 
-        # Handle inline SVGs
-        for svg in soup.find_all('svg'):
-            # Add required SVG attributes if missing
-            if not svg.get('xmlns'):
-                svg['xmlns'] = 'http://www.w3.org/2000/svg'
-            if not svg.get('width'):
-                svg['width'] = '24'
-            if not svg.get('height'):
-                svg['height'] = '24'
-            if not svg.get('viewBox'):
-                if svg.get('viewbox'):
-                    svg['viewBox'] = svg.get('viewbox')
-                else:
-                    svg['viewBox'] = '0 0 24 24'
+        # Handle inline SVGs; svgs is in document order, so an SVG's ancestors have
+        # all been rewritten before their style chain is memoized
+        style_cache = {}
+        for svg in svgs:
+            # Add required SVG attributes if missing; parsers may have lowercased viewBox
+            for attr, default in _SVG_DEFAULT_ATTRS:
+                if not svg.get(attr):
+                    svg[attr] = svg.get(attr.lower()) or default
 
             # Ensure proper rendering in wkhtmltopdf
             current_style = svg.get('style', '')
@@ -200,28 +399,15 @@ class HTMLPreprocessor:
             for comment in svg.find_all(string=lambda text: isinstance(text, Comment)):
                 comment.extract()
 
-            # Extract CSS variables from parent elements
-            parent_styles = []
-            parent = svg.parent
-            while parent and parent.name:
-                if parent.get('style'):
-                    parent_styles.append(parent.get('style'))
-                parent = parent.parent
+            # Extract CSS variables from parent elements, nearest first
+            parent_styles = _ancestor_styles(svg.parent, style_cache)
 
             # Add parent styles to SVG
             if parent_styles:
                 svg['style'] = f"{' '.join(parent_styles)} {svg.get('style', '')}"
 
-            # Clean up SVG string
-            svg_str = str(svg)
-            svg_str = re.sub(r'<!--.*?-->', '', svg_str, flags=re.DOTALL)  # Remove any remaining comments
-            svg_str = re.sub(r'\s+', ' ', svg_str)  # Normalize whitespace
-            svg_str = svg_str.strip()  # Remove leading/trailing whitespace
-
-            # URL encode the entire SVG string at once
-            svg_str = quote(svg_str, safe='')
-
-            data_uri = f"data:image/svg+xml;charset=utf-8,{svg_str}"
+            # Repeated icons serialize identically, so their URI is encoded once
+            data_uri = _svg_data_uri(str(svg))
 
             # Create new img tag with proper attributes
             new_img = soup.new_tag('img')
@@ -242,31 +428,45 @@ class HTMLPreprocessor:
 
             svg.replace_with(new_img)
 
-        # Fix external SVG references
-        for svg_link in soup.find_all(['use', 'image'], href=True):
-            href = svg_link.get('href')
-            if href and not href.startswith(('http://', 'https://', 'data:', 'file://', '#')):
-                svg_link['href'] = urljoin(base_url, href)
-
-        # Fix CSS links
-        for link in soup.find_all('link', rel='stylesheet'):
-            href = link.get('href')
-            if href and not href.startswith(('http://', 'https://', 'data:', 'file://')):
-                link['href'] = urljoin(base_url, href)
-
-        # Fix script sources
-        for script in soup.find_all('script', src=True):
-            src = script.get('src')
-            if src and not src.startswith(('http://', 'https://', 'data:', 'file://')):
-                script['src'] = urljoin(base_url, src)
+        # Fix external SVG references, CSS links and script sources; references
+        # inside inline SVGs were already serialized into their data URIs, so
+        # rewriting their detached originals has no effect
+        for tag in resources:
+            attr = self._RESOURCE_ATTRS[tag.name]
+            value = tag.get(attr)
+            if not value:
+                continue
+            if tag.name == 'link' and 'stylesheet' not in tag.get_attribute_list('rel'):
+                continue
+            # SVG references may point at fragments of the current document
+            prefixes = _SVG_REF_PREFIXES if tag.name in ('use', 'image') else _ABSOLUTE_PREFIXES
+            if not value.startswith(prefixes):
+                tag[attr] = urljoin(base_url, value)
+
+    def _fs_read(self, file_path: str) -> bytes:
+        """Return the raw bytes of a file.
+
+        All content reads go through this method, so subclasses can serve files
+        from somewhere other than the local disk; sections of such subclasses are
+        then extracted in this process rather than in workers. Opens the file once with
+        os.open; the open itself is the existence and permission check.
+        """
+        fd = os.open(file_path, os.O_RDONLY)
+        with os.fdopen(fd, 'rb') as f:
+            return f.read()
 
     def _read_file(self, file_path: str) -> str:
-        """Read the contents of a file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        """Read the contents of a file.
+
+        Decoding and newline handling match text-mode open.
+        """
+        text = self._fs_read(file_path).decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
 
     def _extract_navigation(self, html_file: str) -> list[NavigationItem]:
-        """Extract navigation items from the HTML."""
+        """Extract navigation items from the HTML, normalized and deduplicated in order."""
         def _normalize_url(url: str) -> str:
             if url == '.html':
                 return 'index.html'
@@ -274,20 +474,27 @@ class HTMLPreprocessor:
                 return f"index.html{url}"
             return url
 
-        soup = BeautifulSoup(self._read_file(html_file), 'html.parser')
         nav_items = []
         seen_items = set()
 
-        for nav in soup.find_all('nav', {'class': 'md-nav'}):
-            for link in nav.find_all('a', {'class': 'md-nav__link'}):
+        # Navigation is only read, so query the lxml tree directly without BeautifulSoup
+        # Feed the raw bytes: lxml decodes them and normalizes newlines itself, and
+        # documents with an XML declaration parse as well
+        try:
+            tree = lxml.html.fromstring(self._fs_read(html_file), parser=_UTF8_HTML_PARSER)
+        except etree.ParserError:
+            return nav_items  # Document without any elements
+
+        for nav in _NAV_XPATH(tree):
+            for link in _NAV_LINK_XPATH(nav):
                 url = link.get('href', '')
-                text = link.get_text(strip=True)
+                text = ''.join(part.strip() for part in _NAV_TEXT_XPATH(link))
 
                 if not url or not text:
                     continue
 
                 url = _normalize_url(url)
-                item_key = f"{url}|{text}"
+                item_key = (url, text)
 
                 if item_key not in seen_items:
                     seen_items.add(item_key)
@@ -295,21 +502,6 @@ class HTMLPreprocessor:
 
         return nav_items
 
-    def _deduplicate_navigation(self) -> None:
-        """Deduplicate navigation items while preserving order."""
-        seen = set()
-        unique_items = []
-        for item in self.debug_info["navigation"]["items"]:
-            url = item['url']
-            if url.startswith('#'):
-                url = f"index.html{url}"
-            key = f"{url}|{item['text']}"
-            if key not in seen:
-                seen.add(key)
-                item['url'] = url  # Update the URL to include index.html for fragments
-                unique_items.append(item)
-        self.debug_info["navigation"]["items"] = unique_items
-
     def _map_url_to_file(self, url: str, html_files: List[str]) -> Optional[str]:
         """Map a navigation URL to an actual file path."""
         if url in self.url_to_file_map:
@@ -323,7 +515,12 @@ class HTMLPreprocessor:
                     self.url_to_file_map[url] = file_path
                     return file_path
 
-        # Try direct match
+        # Try a known relative path, then fall back to any suffix match
+        file_path = self._known_files.get(url)
+        if file_path:
+            self.url_to_file_map[url] = file_path
+            return file_path
+
         for file_path in html_files:
             if file_path.endswith(url):
                 self.url_to_file_map[url] = file_path
@@ -331,36 +528,270 @@ class HTMLPreprocessor:
 
         return None
 
+    def _index_known_files(self, html_files: List[str]) -> None:
+        """Index every relative path suffix of the found files for navigation lookups."""
+        self._known_files = {}
+        # Scanned paths are built from base_dir, so slicing replaces os.path.relpath
+        prefix = os.path.join(self.base_dir, '')
+        for file_path in html_files:
+            if file_path.startswith(prefix):
+                rel_path = file_path[len(prefix):]
+            else:
+                rel_path = os.path.relpath(file_path, self.base_dir)
+            parts = rel_path.replace(os.sep, '/').split('/')
+            for i in range(len(parts)):
+                self._known_files.setdefault('/'.join(parts[i:]), file_path)
+
+    def _scan_html_files(self, directory: str) -> Iterator[str]:
+        """Yield HTML file paths below a directory, tracing each entry in debug mode."""
+        return scan_html_files(directory, print if self.debug_dir else None)
+
+    def _content_rank(self, tag: Tag) -> int:
+        """Return the preference rank of a tag as main content, lower is better."""
+        for rank, (_, name, attrs) in enumerate(self._CONTENT_SELECTORS):
+            if tag.name == name and all(
+                value in tag.get_attribute_list(attr) for attr, value in attrs.items()
+            ):
+                return rank
+        return len(self._CONTENT_SELECTORS)
+
+    def _extract_section(self, file_path: str, nav_text: Optional[str] = None) -> Dict[str, Any]:
+        """Parse one file and wrap its main content in a document section.
+
+        Only touches the file itself, so it can run in a worker process.
+
+        Args:
+            file_path: HTML file to process
+            nav_text: Navigation label of the file, if it was linked from the navigation
+
+        Returns:
+            Result with the file, a status of 'success', 'empty' or 'failed', and
+            the serialized section and debug details or the error message
+        """
+        try:
+            content = self._read_file(file_path)
+            if not _CONTENT_TAG_RE.search(content):
+                return {"file": file_path, "status": "empty"}  # Skip parsing, nothing to extract
+            soup = BeautifulSoup(content, self.parser)
+
+            # Fix resource paths
+            self._fix_resource_paths(soup, file_path, content)
+
+            # Extract main content
+            elements_found = {
+                "main": False,
+                "article": False,
+                "main_div": False,
+                "content_div": False,
+                "body": False
+            }
+
+            # Pick the most preferred content element in a single pass over the tree
+            main_content = None
+            best_rank = len(self._CONTENT_SELECTORS)
+            for tag in soup.descendants:
+                if not isinstance(tag, Tag):
+                    continue
+                rank = self._content_rank(tag)
+                if rank < best_rank:
+                    main_content, best_rank = tag, rank
+                    if rank == 0:
+                        break
+
+            if main_content is not None:
+                elements_found[self._CONTENT_SELECTORS[best_rank][0]] = True
+            elif _BODY_TAG_RE.search(content):
+                # lxml synthesizes a <body> for any input, so only use one the file declares
+                main_content = soup.find('body')
+                elements_found["body"] = True
+
+            if not main_content:
+                return {"file": file_path, "status": "empty"}
+
+            # Remove unwanted elements; header and footer are preserved
+            for element in main_content.find_all(self._STRIPPED_TAGS):
+                element.decompose()
+
+            # Add a section wrapper with file info around the serialized content
+            nav_attr = '' if nav_text is None else f' data-nav-text="{_escape_attr(nav_text)}"'
+            section_str = _SECTION_TEMPLATE.format_map({
+                "nav": nav_attr,
+                "source": _escape_attr(os.path.basename(file_path)),
+                "body": str(main_content),
+            })
+
+            # Expand all details elements so their content is shown by default
+            content_str = _DETAILS_CLOSED_RE.sub('<details open="open"', section_str)
+            details = {"file": file_path}
+            if nav_text is not None:
+                details["nav_text"] = nav_text
+            details.update({
+                "elements_found": elements_found,
+                "status": "success",
+                "content_length": len(content_str)
+            })
+            return {"file": file_path, "status": "success", "content": content_str, "details": details}
+
+        except Exception as e:
+            return {"file": file_path, "status": "failed", "error": str(e)}
+
+    def _extract_sections(self, jobs: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Extract sections for (file_path, nav_text) jobs, serving unchanged files from the cache."""
+        if not self.cache_dir:
+            return self._run_extractions(jobs)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        pending = []
+        for index, (file_path, nav_text) in enumerate(jobs):
+            key = self._content_cache_key(file_path, nav_text)
+            cached = self._content_cache.get(key) if key else None
+            if cached is not None:
+                # Report the file under the path this run was given
+                results[index] = dict(cached, file=file_path)
+                self._live_cache[key] = cached
+            else:
+                pending.append((index, key))
+
+        extracted = self._run_extractions([jobs[index] for index, _ in pending])
+        for (index, key), result in zip(pending, extracted):
+            results[index] = result
+            # Failures may be transient (e.g. permissions), so they are not cached
+            if key and result["status"] != "failed":
+                self._content_cache[key] = result
+                self._live_cache[key] = result
+        return results
+
+    def _run_extractions(self, jobs: List[Tuple[str, Optional[str]]]) -> List[Dict[str, Any]]:
+        """Run _extract_section for each job, in a process pool for large sites.
+
+        The pool is shared by the run's batches. If it cannot start or fails, the
+        jobs are extracted in this process instead of being lost. Workers rebuild
+        the preprocessor from its class, base directory and parser alone, so
+        subclasses with their own __init__ or _fs_read, whose state or file source
+        a worker would not have, and classes that cannot be pickled always extract
+        in this process.
+        """
+        cls = type(self)
+        pool = None
+        if (len(jobs) >= _PROCESS_POOL_THRESHOLD
+                and cls.__init__ is HTMLPreprocessor.__init__
+                and cls._fs_read is HTMLPreprocessor._fs_read
+                and _is_picklable(cls)):
+            pool = self._process_pool()
+        if pool is not None:
+            # Ship only strings to the workers instead of pickling this instance per chunk
+            worker = functools.partial(_extract_section_in_worker, cls, self.parser)
+            file_paths, nav_texts = zip(*jobs)
+            try:
+                return list(pool.map(worker, file_paths, nav_texts, chunksize=16))
+            except Exception as e:
+                # _extract_section reports its own errors, so this is the pool itself
+                # failing, e.g. a class that cannot be pickled or workers that died
+                print(f"Process pool failed ({str(e)}), extracting in this process")
+                self._pool_failed = True
+                self._close_process_pool()
+        return [self._extract_section(file_path, nav_text) for file_path, nav_text in jobs]
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Return the run's worker pool, starting it on first use; None if unavailable."""
+        if self._pool is None and not self._pool_failed:
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+            except (OSError, NotImplementedError) as e:
+                # e.g. no /dev/shm for the pool's locks on sandboxed hosts
+                print(f"Process pool unavailable ({str(e)}), extracting in this process")
+                self._pool_failed = True
+        return self._pool
+
+    def _close_process_pool(self) -> None:
+        """Shut the run's worker pool down, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _content_cache_key(self, file_path: str, nav_text: Optional[str]) -> Optional[str]:
+        """Key a file's extraction result by its content hash and the inputs that shape it.
+
+        Returns None when the file cannot be read, so the extraction reports the error.
+        """
+        try:
+            digest = hashlib.sha256(self._fs_read(file_path)).hexdigest()
+        except OSError:
+            return None
+        # The section embeds absolute resource paths, so the absolute file path is part
+        # of the key; a relative one would match again after changing directory
+        key_path = os.path.abspath(file_path)
+        return json.dumps([_CONTENT_CACHE_VERSION, self.parser, key_path, nav_text, digest])
+
+    def _load_content_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load cached extraction results, starting empty if the cache is missing or corrupt."""
+        if not self.cache_dir:
+            return {}
+        try:
+            with open(os.path.join(self.cache_dir, _CONTENT_CACHE_FILE), 'rb') as f:
+                cache = json.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_content_cache(self) -> None:
+        """Persist the extraction cache to the cache directory.
+
+        Only entries used by the current run are kept, so sections of edited or
+        deleted files do not accumulate across runs.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_file = os.path.join(self.cache_dir, _CONTENT_CACHE_FILE)
+        _write_bytes(cache_file, [json.dumps(self._live_cache).encode('utf-8')])
+
+    def _record_section(self, result: Dict[str, Any], master_content: List[str]) -> bool:
+        """Record an extraction result in the debug info and return whether it succeeded."""
+        file_path = result["file"]
+        if result["status"] == "success":
+            master_content.append(result["content"])
+            self.debug_info["content_extraction_details"].append(result["details"])
+            self.debug_info["content_extraction"]["successful"].append(file_path)
+            return True
+
+        if result["status"] == "empty":
+            self.debug_info["content_extraction"]["empty"].append(file_path)
+        else:
+            self.debug_info["content_extraction"]["failed"].append(file_path)
+            self.debug_info["errors"].append({
+                "type": "content_extraction",
+                "file": file_path,
+                "error": result["error"]
+            })
+            print(f"Error processing file {file_path}: {result['error']}")
+        return False
+
     def process_html_files(self) -> Tuple[List[str], str]:
         """Process HTML files and return a list of file paths and master HTML content."""
         html_files = []
         master_content = []
         processed_files = set()
+        self._live_cache = {}
+        self._pool = None
+        self._pool_failed = False
 
         try:
             print(f"Searching for HTML files in: {self.base_dir}")
-            for root, _, files in os.walk(self.base_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    print(f"Found file: {file_path}")
-
-                    if os.path.isfile(file_path):
-                        if file.endswith('.html') or file == '.html':  # Explicitly handle .html file
-                            print(f"Adding HTML file: {file_path}")
-                            html_files.append(file_path)
-                            self.debug_info["file_processing"]["found_files"].append(file_path)
-                        else:
-                            print(f"Skipping non-HTML file: {file_path}")
-                    else:
-                        print(f"Skipping non-file: {file_path}")
-
-            # Find the main/index file to extract navigation
-            main_file = None
-            for file_path in html_files:
-                basename = os.path.basename(file_path)
-                if basename in ['index.html', '.html']:
-                    main_file = file_path
-                    break
+            for file_path in self._scan_html_files(self.base_dir):
+                html_files.append(file_path)
+                self.debug_info["file_processing"]["found_files"].append(file_path)
+            print(f"Found {len(html_files)} HTML files")
+            self._index_known_files(html_files)
+
+            # Find the main/index file to extract navigation; a bare file name is a
+            # suffix key, so the index maps it to the first file with that name
+            candidates = [
+                file_path for file_path in map(self._known_files.get, ('index.html', '.html'))
+                if file_path
+            ]
+            main_file = candidates[0] if candidates else None
+            if len(candidates) > 1:
+                # With both present, the one found first wins
+                main_file = min(candidates, key=html_files.index)
 
             # Extract navigation first
             if main_file:
@@ -375,162 +806,28 @@ class HTMLPreprocessor:
                     print(f"Error extracting navigation from {main_file}: {str(e)}")
 
             # Process navigation items in order
+            nav_jobs = []
+            queued_files = set()
             for nav_item in self.debug_info["navigation"]["items"]:
                 file_path = self._map_url_to_file(nav_item['url'], html_files)
-                if file_path and file_path not in processed_files:
-                    try:
-                        print(f"Processing navigation item file: {file_path}")
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            soup = BeautifulSoup(content, 'html.parser')
-
-                            # Fix resource paths
-                            self._fix_resource_paths(soup, file_path)
-
-                            # Extract main content
-                            main_content = None
-                            elements_found = {
-                                "main": False,
-                                "article": False,
-                                "main_div": False,
-                                "content_div": False,
-                                "body": False
-                            }
-
-                            # Try different content selectors in order of preference
-                            if soup.find('main'):
-                                main_content = soup.find('main')
-                                elements_found["main"] = True
-                            elif soup.find('article'):
-                                main_content = soup.find('article')
-                                elements_found["article"] = True
-                            elif soup.find('div', {'id': 'main-content'}):
-                                main_content = soup.find('div', {'id': 'main-content'})
-                                elements_found["main_div"] = True
-                            elif soup.find('div', {'class': 'content'}):
-                                main_content = soup.find('div', {'class': 'content'})
-                                elements_found["content_div"] = True
-                            else:
-                                main_content = soup.find('body')
-                                elements_found["body"] = True
-
-                            if main_content:
-                                # Only remove unwanted elements if we found a main content area
-                                if elements_found["main"] or elements_found["article"] or elements_found["main_div"] or elements_found["content_div"]:
-                                    for element in main_content.find_all(['script', 'style', 'nav']):
-                                        element.decompose()
-                                else:
-                                    # If we're using the body, preserve header and footer but remove other unwanted elements
-                                    for element in main_content.find_all(['script', 'style', 'nav']):
-                                        element.decompose()
-
-                                # Add a section wrapper with file info
-                                section = soup.new_tag('section')
-                                section['class'] = 'document-section'
-                                section['data-source'] = os.path.basename(file_path)
-                                section['data-nav-text'] = nav_item['text']
-                                main_content.wrap(section)
-
-                                content_str = str(section)
-                                master_content.append(content_str)
-
-                                self.debug_info["content_extraction_details"].append({
-                                    "file": file_path,
-                                    "nav_text": nav_item['text'],
-                                    "elements_found": elements_found,
-                                    "status": "success",
-                                    "content_length": len(content_str)
-                                })
-                                self.debug_info["content_extraction"]["successful"].append(file_path)
-                                processed_files.add(file_path)
-                            else:
-                                self.debug_info["content_extraction"]["empty"].append(file_path)
-
-                    except Exception as e:
-                        self.debug_info["content_extraction"]["failed"].append(file_path)
-                        self.debug_info["errors"].append({
-                            "type": "content_extraction",
-                            "file": file_path,
-                            "error": str(e)
-                        })
-                        print(f"Error processing file {file_path}: {str(e)}")
+                if file_path and file_path not in queued_files:
+                    queued_files.add(file_path)
+                    nav_jobs.append((file_path, nav_item['text']))
+
+            verbose = bool(self.debug_dir)
+            for result in self._extract_sections(nav_jobs):
+                if verbose:
+                    print(f"Processing navigation item file: {result['file']}")
+                if self._record_section(result, master_content):
+                    processed_files.add(result['file'])
 
             # Process remaining files that weren't in navigation
-            for file_path in html_files:
-                if file_path not in processed_files:
-                    try:
-                        print(f"Processing remaining file: {file_path}")
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            soup = BeautifulSoup(content, 'html.parser')
-
-                            # Fix resource paths
-                            self._fix_resource_paths(soup, file_path)
-
-                            # Extract main content
-                            main_content = None
-                            elements_found = {
-                                "main": False,
-                                "article": False,
-                                "main_div": False,
-                                "content_div": False,
-                                "body": False
-                            }
-
-                            # Try different content selectors in order of preference
-                            if soup.find('main'):
-                                main_content = soup.find('main')
-                                elements_found["main"] = True
-                            elif soup.find('article'):
-                                main_content = soup.find('article')
-                                elements_found["article"] = True
-                            elif soup.find('div', {'id': 'main-content'}):
-                                main_content = soup.find('div', {'id': 'main-content'})
-                                elements_found["main_div"] = True
-                            elif soup.find('div', {'class': 'content'}):
-                                main_content = soup.find('div', {'class': 'content'})
-                                elements_found["content_div"] = True
-                            else:
-                                main_content = soup.find('body')
-                                elements_found["body"] = True
-
-                            if main_content:
-                                # Only remove unwanted elements if we found a main content area
-                                if elements_found["main"] or elements_found["article"] or elements_found["main_div"] or elements_found["content_div"]:
-                                    for element in main_content.find_all(['script', 'style', 'nav']):
-                                        element.decompose()
-                                else:
-                                    # If we're using the body, preserve header and footer but remove other unwanted elements
-                                    for element in main_content.find_all(['script', 'style', 'nav']):
-                                        element.decompose()
-
-                                # Add a section wrapper with file info
-                                section = soup.new_tag('section')
-                                section['class'] = 'document-section'
-                                section['data-source'] = os.path.basename(file_path)
-                                main_content.wrap(section)
-
-                                content_str = str(section)
-                                master_content.append(content_str)
-
-                                self.debug_info["content_extraction_details"].append({
-                                    "file": file_path,
-                                    "elements_found": elements_found,
-                                    "status": "success",
-                                    "content_length": len(content_str)
-                                })
-                                self.debug_info["content_extraction"]["successful"].append(file_path)
-                            else:
-                                self.debug_info["content_extraction"]["empty"].append(file_path)
-
-                    except Exception as e:
-                        self.debug_info["content_extraction"]["failed"].append(file_path)
-                        self.debug_info["errors"].append({
-                            "type": "content_extraction",
-                            "file": file_path,
-                            "error": str(e)
-                        })
-                        print(f"Error processing file {file_path}: {str(e)}")
+            remaining_jobs = [(file_path, None) for file_path in html_files
+                              if file_path not in processed_files]
+            for result in self._extract_sections(remaining_jobs):
+                if verbose:
+                    print(f"Processing remaining file: {result['file']}")
+                self._record_section(result, master_content)
 
         except Exception as e:
             self.debug_info["errors"].append({
@@ -538,9 +835,11 @@ class HTMLPreprocessor:
                 "error": str(e)
             })
             print(f"Error processing HTML files: {str(e)}")
+        finally:
+            self._close_process_pool()
 
         # Create master HTML file with base path and styles
-        master_html = f"""
+        master_head = f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -563,13 +862,19 @@ class HTMLPreprocessor:
             </style>
         </head>
         <body>
-            {''.join(master_content)}
+            """
+        master_tail = """
         </body>
         </html>
         """
+        master_parts = [master_head, *master_content, master_tail]
+        master_html = ''.join(master_parts)
 
-        # Deduplicate navigation items
-        self._deduplicate_navigation()
+        if self.cache_dir:
+            try:
+                self._save_content_cache()
+            except OSError as e:
+                print(f"Error saving content cache: {str(e)}")
 
         # Update summary statistics
         self.debug_info["summary"] = {
@@ -585,11 +890,27 @@ class HTMLPreprocessor:
         if self.debug_dir:
             os.makedirs(self.debug_dir, exist_ok=True)
             debug_file = os.path.join(self.debug_dir, 'preprocessor_debug.json')
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                json.dump(self.debug_info, f, indent=2)
+            _write_bytes(debug_file, [_dump_debug_json(self.debug_info)])
 
+            # Encode section by section so no second full copy of the document is held
             master_file = os.path.join(self.debug_dir, 'master.html')
-            with open(master_file, 'w', encoding='utf-8') as f:
-                f.write(master_html)
+            _write_bytes(master_file, (part.encode('utf-8') for part in master_parts))
+
+        return html_files, master_html
+
+
+def _is_picklable(obj: Any) -> bool:
+    """Return whether obj can be sent to a worker process, e.g. not a class local to a function."""
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
+
 
-        return html_files, master_html
\ No newline at end of file
+def _extract_section_in_worker(
+    preprocessor_cls: type, parser: str, file_path: str, nav_text: Optional[str]
+) -> Dict[str, Any]:
+    """Extract one section in a worker process with a fresh, empty preprocessor."""
+    base_dir = os.path.dirname(file_path)
+    return preprocessor_cls(base_dir, parser=parser)._extract_section(file_path, nav_text)